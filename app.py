@@ -5,11 +5,20 @@ Streamlit dashboard for exploring HRMS data
 
 import streamlit as st
 import duckdb
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from datetime import date, timedelta
 from pathlib import Path
 import ollama
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # Page config
 st.set_page_config(
@@ -19,32 +28,375 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+def load_extension(conn, name):
+    """Install and load a DuckDB extension unless it is already loaded."""
+    row = conn.execute(
+        "SELECT installed, loaded FROM duckdb_extensions() WHERE extension_name = ?", [name]
+    ).fetchone()
+    if row is None:
+        return False
+    installed, loaded = row
+    if loaded:
+        return True
+    try:
+        if not installed:
+            conn.execute(f"INSTALL {name}")
+        conn.execute(f"LOAD {name}")
+    except duckdb.Error:
+        return False
+    return True
+
+DB_PATH = Path(__file__).parent / "data" / "hrmsdb.duckdb"
+
 # Database connection
 @st.cache_resource
 def get_connection():
-    db_path = Path(__file__).parent / "data" / "hrmsdb.duckdb"
-    if not db_path.exists():
+    if not DB_PATH.exists():
         st.error("Database not found. Run `python init_semantic_layer.py` first.")
         st.stop()
-    conn = duckdb.connect(str(db_path), read_only=True)
-    # Install and load extensions (safe to call even if already installed)
-    for ext in ['fts', 'excel', 'vss', 'httpfs']:
-        try:
-            conn.execute(f"INSTALL {ext}; LOAD {ext};")
-        except Exception:
-            pass  # Extension may already be loaded or not needed
+    conn = duckdb.connect(str(DB_PATH), read_only=True)
+    # Other extensions are loaded on first use through ensure_extension()
+    load_extension(conn, 'httpfs')
+    # Leave a core free for the Streamlit server when several sessions query at once
+    conn.execute(f"SET threads={max(1, (os.cpu_count() or 2) - 1)}")
+    # jemalloc limits RSS growth in this long-running process (Linux builds only)
+    load_extension(conn, 'jemalloc')
+    conn.execute("SET enable_object_cache=true")
+    # No terminal to draw a progress bar in; skip its bookkeeping
+    conn.execute("SET enable_progress_bar=false")
+    # Optional cap for hosts shared with other services (DuckDB default: 80% of RAM)
+    memory_limit = os.getenv('DUCKDB_MEMORY_LIMIT')
+    if memory_limit:
+        conn.execute("SET memory_limit=?", [memory_limit])
     return conn
 
-conn = get_connection()
+# DuckDB connections are not safe for concurrent execute, so each thread
+# (one per Streamlit script run) queries through its own cursor.
+_thread_local = threading.local()
+
+def get_cursor():
+    """Return this thread's cursor on the shared DuckDB connection."""
+    cursor = getattr(_thread_local, 'cursor', None)
+    if cursor is None:
+        cursor = get_connection().cursor()
+        _thread_local.cursor = cursor
+    return cursor
+
+# Open (or fail fast on a missing database) before rendering any page
+get_connection()
+
+# Extensions are loaded once per database, so every cursor sees them
+@st.cache_resource
+def ensure_extension(name):
+    return load_extension(get_connection(), name)
+
+# On-disk second-level cache for run_query, so results survive server restarts
+QUERY_CACHE_DIR = Path(__file__).parent / "data" / "query_cache"
+QUERY_CACHE_TTL = 300
+
+def prune_query_cache():
+    """Delete disk-cached results older than QUERY_CACHE_TTL."""
+    cutoff = time.time() - QUERY_CACHE_TTL
+    for path in QUERY_CACHE_DIR.glob("*.parquet"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass  # Removed by another session, or still being replaced
 
 # Helper function to run queries
-@st.cache_data(ttl=300)
+# Results are Arrow tables: st.dataframe consumes them natively, and charts
+# convert to pandas only at the plotting site.
+@st.cache_data(ttl=300, max_entries=128, show_spinner=False)
 def run_query(query):
-    return conn.execute(query).fetchdf()
-
+    # Keyed on the database file's mtime too, so a rebuild invalidates old results
+    key = f"{DB_PATH.stat().st_mtime_ns}:{query}"
+    cache_path = QUERY_CACHE_DIR / f"{hashlib.sha256(key.encode()).hexdigest()}.parquet"
+    if cache_path.exists() and time.time() - cache_path.stat().st_mtime < QUERY_CACHE_TTL:
+        return pq.read_table(cache_path)
+    tbl = get_cursor().execute(query).fetch_arrow_table()
+    try:
+        QUERY_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        prune_query_cache()
+        # Write then rename so concurrent readers never see a partial file
+        tmp_path = cache_path.with_suffix(f".{threading.get_ident()}.tmp")
+        pq.write_table(tbl, tmp_path, compression='zstd')
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass  # Disk cache is best-effort; the in-memory cache still applies
+    return tbl
+
+@st.cache_data(ttl=300, max_entries=256, show_spinner=False)
 def run_query_safe(query, params):
-    """Run a parameterized query (not cached due to dynamic params)."""
-    return conn.execute(query, params).fetchdf()
+    """Run a parameterized query, cached on the SQL template and bound parameters."""
+    return get_cursor().execute(query, params).fetch_arrow_table()
+
+# Detail tables are read-only Arrow tables (immutable), so they are cached as
+# shared resources without the per-call hash/copy of the returned data.
+@st.cache_resource(ttl=300, max_entries=32, show_spinner=False)
+def run_query_ro(query):
+    return get_cursor().execute(query).fetch_arrow_table()
+
+# The alerts section refreshes on a timer, so its result is cached no longer
+# than the refresh interval and skips run_query's disk cache
+ALERTS_REFRESH_SECONDS = 60
+
+@st.cache_data(ttl=ALERTS_REFRESH_SECONDS, show_spinner=False)
+def run_alerts_query():
+    return get_cursor().execute(EXECUTIVE_ALERTS_SQL).fetch_arrow_table()
+
+# Independent page queries run side by side; DuckDB releases the GIL while
+# executing, and each pool thread queries through its own cursor.
+@st.cache_resource
+def get_query_pool():
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="query")
+
+def run_parallel(*calls):
+    """Run (func, *args) query calls concurrently and return their results in order."""
+    ctx = get_script_run_ctx()
+
+    def call(func, *args):
+        # Cached helpers expect the calling session's script context
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return func(*args)
+
+    futures = [get_query_pool().submit(call, *c) for c in calls]
+    return [f.result() for f in futures]
+
+# Dropdown option lists change only when the semantic layer is rebuilt
+@st.cache_data(ttl=3600, max_entries=16, show_spinner=False)
+def filter_options(query):
+    """Return the first column of a small option query as a list."""
+    return [row[0] for row in get_cursor().execute(query).fetchall()]
+
+# Option lists precomputed by init_semantic_layer.py, keyed by kind
+@st.cache_resource(ttl=3600, show_spinner=False)
+def get_filter_options():
+    options = {}
+    try:
+        rows = get_cursor().execute(
+            "SELECT kind, value FROM cache.filter_options ORDER BY kind, sort_order"
+        ).fetchall()
+    except duckdb.Error:
+        return options
+    for kind, value in rows:
+        options.setdefault(kind, []).append(value)
+    return options
+
+def dropdown_options(kind, query):
+    """Precomputed options for kind, or the live query on older databases."""
+    return get_filter_options().get(kind) or filter_options(query)
+
+# Latest pay period of a payroll view, bound as a literal filter value.
+# table is always a literal view name, never user input.
+@st.cache_data(ttl=600, max_entries=4, show_spinner=False)
+def latest_pay_period(table):
+    return get_cursor().execute(f"SELECT MAX(pay_period) FROM {table}").fetchone()[0]
+
+def arrow_ipc_bytes(tbl):
+    """Serialize an Arrow table to IPC stream bytes (a stable cache key)."""
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, tbl.schema) as writer:
+        writer.write_table(tbl)
+    return sink.getvalue().to_pybytes()
+
+@st.cache_data(ttl=300, max_entries=64, show_spinner=False)
+def build_figure_json(kind, data, layout, **kwargs):
+    """Build a Plotly Express figure from Arrow IPC bytes and return its JSON."""
+    import plotly.express as px
+    df = pa.ipc.open_stream(data).read_all().to_pandas(split_blocks=True)
+    fig = getattr(px, kind)(df, **kwargs)
+    if layout:
+        fig.update_layout(**layout)
+    return fig.to_json()
+
+def cached_figure(kind, tbl, layout=None, **kwargs):
+    """Return a px.<kind> figure for an Arrow table, reusing cached figure JSON."""
+    import plotly.graph_objects as go
+    return go.Figure(json.loads(build_figure_json(kind, arrow_ipc_bytes(tbl), layout, **kwargs)))
+
+def show_table(data, **kwargs):
+    """Render a result table full-width without the index column."""
+    st.dataframe(data, use_container_width=True, hide_index=True, **kwargs)
+
+# Employee directory search; an empty search term matches every employee
+EMPLOYEE_SQL = """
+    SELECT employee_id, full_name, num_benefit_plans, benefit_plan_types,
+           total_current_arrears, corp_id
+    FROM business.employee_summary
+    WHERE (? = '' OR full_name ILIKE ? OR employee_id LIKE ?)
+    ORDER BY full_name
+    LIMIT ? OFFSET ?
+"""
+
+# Ranked full-text search over the index built by init_semantic_layer.py
+EMPLOYEE_SEARCH_SQL = """
+    SELECT employee_id, full_name, num_benefit_plans, benefit_plan_types,
+           total_current_arrears, corp_id
+    FROM (
+        SELECT *, fts_cache_employee_search.match_bm25(employee_id, ?) AS score
+        FROM cache.employee_search
+    )
+    WHERE score IS NOT NULL
+    ORDER BY score DESC
+    LIMIT ? OFFSET ?
+"""
+
+# Executive Dashboard queries, shared with the startup cache warm-up
+EXECUTIVE_KPIS_SQL = """
+    SELECT active_employees, new_hires_30d, attendance_rate_30d, late_arrivals_30d,
+           latest_gross_payroll, latest_employees_paid, total_ot_hours_30d
+    FROM metrics.executive_kpis
+    LIMIT 1
+"""
+
+ATTENDANCE_TREND_30D_SQL = """
+    SELECT
+        attendance_date,
+        SUM(present_count) as present,
+        SUM(absent_count) as absent,
+        ROUND(100.0 * SUM(present_count) / NULLIF(SUM(total_records), 0), 1) as rate
+    FROM metrics.attendance_daily_metrics
+    WHERE attendance_date >= CURRENT_DATE - INTERVAL '30 days'
+    GROUP BY attendance_date
+    ORDER BY attendance_date
+"""
+
+PAYROLL_TREND_6M_SQL = """
+    SELECT
+        pay_period,
+        SUM(total_gross_pay) as gross_pay,
+        SUM(total_employer_cost) as employer_cost,
+        SUM(employees_paid) as employees
+    FROM metrics.payroll_period_metrics
+    WHERE pay_period >= STRFTIME(CURRENT_DATE - INTERVAL '6 months', '%Y-%m')
+    GROUP BY pay_period
+    ORDER BY pay_period
+"""
+
+# Top-N per priority is done in DuckDB: up to 20 high, 5 medium and 5 low
+EXECUTIVE_ALERTS_SQL = """
+    SELECT priority, employee_name, detail
+    FROM metrics.executive_alerts
+    QUALIFY ROW_NUMBER() OVER (PARTITION BY priority_rank ORDER BY alert_type)
+        <= CASE priority_rank WHEN 1 THEN 20 ELSE 5 END
+    ORDER BY priority_rank, alert_type
+"""
+
+# Detail-table templates; a filter bound to 'All' (or FALSE) matches every row
+WORKFORCE_DETAIL_SQL = """
+    SELECT employee_id, full_name, department_name, job_code_name,
+           employee_type, employee_status, tenure_band, tenure_years,
+           direct_reports, hourly_rate
+    FROM business.workforce_demographics
+    WHERE (? = 'All' OR department_name = ?)
+      AND (? = 'All' OR employee_status = ?)
+      AND (? = 'All' OR tenure_band = ?)
+    ORDER BY department_name, full_name
+    LIMIT 500
+"""
+
+ATTENDANCE_RECORDS_SQL = """
+    SELECT attendance_date, employee_name, department_name, attendance_status,
+           is_late, late_by_mins, total_hours, ot_hours
+    FROM business.daily_attendance_detail
+    WHERE attendance_date BETWEEN ? AND ?
+      AND (? = 'All' OR department_name = ?)
+      AND (? = 'All' OR attendance_status = ?)
+      AND (NOT ? OR is_late = TRUE)
+    ORDER BY attendance_date DESC, employee_name
+    LIMIT ? OFFSET ?
+"""
+
+PAYROLL_RECORDS_SQL = """
+    SELECT employee_name, department_name, pay_period, gross_pay, net_pay,
+           deductions, total_hours, effective_hourly_rate
+    FROM business.payroll_analytics
+    WHERE (? = 'All' OR pay_period = ?)
+      AND (? = 'All' OR department_name = ?)
+    ORDER BY gross_pay DESC
+    LIMIT 500
+"""
+
+# Rows per page on the paginated detail tables
+PAGE_SIZE = 50
+
+def page_offset(key):
+    """Render a page selector and return the row offset of the chosen page."""
+    page_num = st.number_input("Page", min_value=1, value=1, step=1, key=key)
+    return (page_num - 1) * PAGE_SIZE
+
+# Trend charts switch to a coarser bucket (week, then month) once the
+# range would plot more than this many points
+TREND_MAX_DAILY_POINTS = 180
+TREND_BUCKET_LABELS = {'day': 'Daily', 'week': 'Weekly', 'month': 'Monthly'}
+
+def trend_bucket_for(days):
+    """Pick the DATE_TRUNC bucket that keeps a trend near TREND_MAX_DAILY_POINTS."""
+    if days <= TREND_MAX_DAILY_POINTS:
+        return 'day'
+    if days <= TREND_MAX_DAILY_POINTS * 7:
+        return 'week'
+    return 'month'
+
+# How long Ollama keeps the AI Query model loaded after its last request
+OLLAMA_KEEP_ALIVE = "30m"
+
+# A single SQL statement is short: cap its length, keep sampling near-greedy,
+# and stop at the end of the statement or at a closing code fence
+SQL_GENERATION_OPTIONS = {
+    'num_ctx': 4096,
+    'num_predict': 300,
+    'temperature': 0.1,
+    'top_p': 0.9,
+    'stop': [';', '\n```'],
+}
+
+# Markdown code fence some models wrap their SQL in (closing fence optional)
+SQL_FENCE = re.compile(r"^```(?:\w+)?\s*\n?(.*?)\n?(?:```\s*)?$", re.DOTALL)
+
+# Generated SQL must be a query, never DML or DDL
+READ_QUERY = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+# Column configs are plain data, built once at import rather than per rerun
+TOP_EARNER_COLS = {
+    "gross_pay": st.column_config.NumberColumn("Gross Pay", format="$%.2f"),
+    "effective_hourly_rate": st.column_config.NumberColumn("Eff. Rate", format="$%.2f")
+}
+
+PAYROLL_RECORD_COLS = {
+    "gross_pay": st.column_config.NumberColumn("Gross Pay", format="$%.2f"),
+    "net_pay": st.column_config.NumberColumn("Net Pay", format="$%.2f"),
+    "deductions": st.column_config.NumberColumn("Deductions", format="$%.2f"),
+    "effective_hourly_rate": st.column_config.NumberColumn("Eff. Rate", format="$%.2f")
+}
+
+EMPLOYEE_COLS = {
+    "employee_id": "Employee ID",
+    "full_name": "Name",
+    "num_benefit_plans": "# Plans",
+    "benefit_plan_types": st.column_config.TextColumn("Plan Types", width="large"),
+    "total_current_arrears": st.column_config.NumberColumn("Arrears", format="$%.2f"),
+    "corp_id": "Corp ID"
+}
+
+# Warm the landing page's caches in the background once per server process,
+# so the first visitor does not wait on cold queries.
+@st.cache_resource
+def prewarm_cache():
+    def work():
+        for load in (lambda: run_query(EXECUTIVE_KPIS_SQL),
+                     lambda: run_query(ATTENDANCE_TREND_30D_SQL),
+                     lambda: run_query(PAYROLL_TREND_6M_SQL),
+                     run_alerts_query):
+            try:
+                load()
+            except Exception:
+                pass  # The page reports its own errors when it runs the query
+    threading.Thread(target=work, name="prewarm", daemon=True).start()
+    return True
+
+prewarm_cache()
 
 # Sidebar navigation
 st.sidebar.title("HRMS Dashboard")
@@ -59,14 +411,14 @@ if page == "Executive Dashboard":
 
     # Try to get KPIs from the metrics view
     try:
-        kpis = run_query("SELECT * FROM metrics.executive_kpis LIMIT 1")
-        has_kpis = len(kpis) > 0
+        kpis = run_query(EXECUTIVE_KPIS_SQL)
+        has_kpis = kpis.num_rows > 0
     except Exception:
         has_kpis = False
 
-    if has_kpis:
-        kpi_row = kpis.iloc[0]
-
+    # Chart and alert sections are fragments, so a rerun of one (e.g. the alert
+    # refresh) does not rerun every KPI, trend and alert query on the page
+    def render_kpi_cards(kpi_row):
         # KPI Cards Row
         col1, col2, col3, col4 = st.columns(4)
 
@@ -103,96 +455,60 @@ if page == "Executive Dashboard":
                 delta_color="off"
             )
 
-        st.divider()
-
-        # Trend Charts Row
-        col1, col2 = st.columns(2)
-
-        with col1:
-            st.subheader("Attendance Trend (30 Days)")
-            try:
-                attendance_trend = run_query("""
-                    SELECT
-                        attendance_date,
-                        SUM(present_count) as present,
-                        SUM(absent_count) as absent,
-                        ROUND(100.0 * SUM(present_count) / NULLIF(SUM(total_records), 0), 1) as rate
-                    FROM metrics.attendance_daily_metrics
-                    WHERE attendance_date >= CURRENT_DATE - INTERVAL '30 days'
-                    GROUP BY attendance_date
-                    ORDER BY attendance_date
-                """)
-                if len(attendance_trend) > 0:
-                    fig = px.line(
-                        attendance_trend,
-                        x='attendance_date',
-                        y='rate',
-                        title=None,
-                        labels={'attendance_date': 'Date', 'rate': 'Attendance Rate (%)'}
-                    )
-                    fig.update_layout(height=300)
-                    fig.add_hline(y=90, line_dash="dash", line_color="green", annotation_text="Target 90%")
-                    st.plotly_chart(fig, use_container_width=True)
-                else:
-                    st.info("No attendance data available for the last 30 days")
-            except Exception as e:
-                st.warning(f"Could not load attendance trend: {e}")
-
-        with col2:
-            st.subheader("Payroll by Period")
-            try:
-                payroll_trend = run_query("""
-                    SELECT
-                        pay_period,
-                        SUM(total_gross_pay) as gross_pay,
-                        SUM(total_employer_cost) as employer_cost,
-                        SUM(employees_paid) as employees
-                    FROM metrics.payroll_period_metrics
-                    WHERE pay_period >= STRFTIME(CURRENT_DATE - INTERVAL '6 months', '%Y-%m')
-                    GROUP BY pay_period
-                    ORDER BY pay_period
-                """)
-                if len(payroll_trend) > 0:
-                    fig = px.bar(
-                        payroll_trend,
-                        x='pay_period',
-                        y='gross_pay',
-                        title=None,
-                        labels={'pay_period': 'Period', 'gross_pay': 'Gross Pay ($)'}
-                    )
-                    fig.update_layout(height=300)
-                    st.plotly_chart(fig, use_container_width=True)
-                else:
-                    st.info("No payroll data available for the last 6 months")
-            except Exception as e:
-                st.warning(f"Could not load payroll trend: {e}")
+    @st.fragment
+    def render_attendance_trend():
+        st.subheader("Attendance Trend (30 Days)")
+        try:
+            attendance_trend = run_query(ATTENDANCE_TREND_30D_SQL)
+            if attendance_trend.num_rows > 0:
+                fig = cached_figure('line', attendance_trend, x='attendance_date', y='rate',
+                                    title=None,
+                                    labels={'attendance_date': 'Date', 'rate': 'Attendance Rate (%)'},
+                                    layout=dict(height=300))
+                fig.add_hline(y=90, line_dash="dash", line_color="green", annotation_text="Target 90%")
+                st.plotly_chart(fig, use_container_width=True)
+            else:
+                st.info("No attendance data available for the last 30 days")
+        except Exception as e:
+            st.warning(f"Could not load attendance trend: {e}")
 
-        st.divider()
+    @st.fragment
+    def render_payroll_trend():
+        st.subheader("Payroll by Period")
+        try:
+            payroll_trend = run_query(PAYROLL_TREND_6M_SQL)
+            if payroll_trend.num_rows > 0:
+                fig = cached_figure('bar', payroll_trend, x='pay_period', y='gross_pay',
+                                    title=None,
+                                    labels={'pay_period': 'Period', 'gross_pay': 'Gross Pay ($)'},
+                                    layout=dict(height=300))
+                st.plotly_chart(fig, use_container_width=True)
+            else:
+                st.info("No payroll data available for the last 6 months")
+        except Exception as e:
+            st.warning(f"Could not load payroll trend: {e}")
 
-        # Alerts Section
+    @st.fragment(run_every=f"{ALERTS_REFRESH_SECONDS}s")
+    def render_alerts():
         st.subheader("Alerts & Issues")
         try:
-            alerts = run_query("""
-                SELECT alert_type, priority, employee_name, description, detail
-                FROM metrics.executive_alerts
-                ORDER BY
-                    CASE priority WHEN 'High' THEN 1 WHEN 'Medium' THEN 2 ELSE 3 END,
-                    alert_type
-                LIMIT 20
-            """)
+            alerts = run_alerts_query()
 
-            if len(alerts) > 0:
+            if alerts.num_rows > 0:
                 # Group by priority
-                high_alerts = alerts[alerts['priority'] == 'High']
-                medium_alerts = alerts[alerts['priority'] == 'Medium']
-                low_alerts = alerts[alerts['priority'] == 'Low']
+                by_priority = {'High': [], 'Medium': [], 'Low': []}
+                for alert in alerts.to_pylist():
+                    by_priority.setdefault(alert['priority'], []).append(alert)
+                high_alerts = by_priority['High']
+                medium_alerts = by_priority['Medium']
+                low_alerts = by_priority['Low']
 
                 col1, col2, col3 = st.columns(3)
 
                 with col1:
                     st.markdown("**🔴 High Priority**")
                     if len(high_alerts) > 0:
-                        for _, alert in high_alerts.iterrows():
+                        for alert in high_alerts:
                             st.warning(f"**{alert['employee_name']}**: {alert['detail']}")
                     else:
                         st.success("No high priority alerts")
@@ -200,7 +516,7 @@ if page == "Executive Dashboard":
                 with col2:
                     st.markdown("**🟡 Medium Priority**")
                     if len(medium_alerts) > 0:
-                        for _, alert in medium_alerts.head(5).iterrows():
+                        for alert in medium_alerts:
                             st.info(f"**{alert['employee_name']}**: {alert['detail']}")
                     else:
                         st.success("No medium priority alerts")
@@ -208,7 +524,7 @@ if page == "Executive Dashboard":
                 with col3:
                     st.markdown("**🟢 Low Priority**")
                     if len(low_alerts) > 0:
-                        for _, alert in low_alerts.head(5).iterrows():
+                        for alert in low_alerts:
                             st.caption(f"**{alert['employee_name']}**: {alert['detail']}")
                     else:
                         st.success("No low priority alerts")
@@ -217,39 +533,84 @@ if page == "Executive Dashboard":
         except Exception as e:
             st.warning(f"Could not load alerts: {e}")
 
+    if has_kpis:
+        render_kpi_cards(kpis.to_pylist()[0])
+
+        st.divider()
+
+        # Trend Charts Row
+        col1, col2 = st.columns(2)
+
+        with col1:
+            render_attendance_trend()
+
+        with col2:
+            render_payroll_trend()
+
+        st.divider()
+
+        # Alerts Section
+        render_alerts()
+
     else:
         # Fallback to basic overview if KPIs view not available
         st.info("Executive KPIs view not available. Showing basic metrics.")
 
         col1, col2, col3, col4 = st.columns(4)
 
-        employee_count = run_query("SELECT COUNT(DISTINCT employee_id) as cnt FROM staging.stg_payroll")['cnt'][0]
-        payroll_records = run_query("SELECT COUNT(*) as cnt FROM raw.crmc_payrollfile")['cnt'][0]
-        attendance_records = run_query("SELECT COUNT(*) as cnt FROM staging.stg_attendance")['cnt'][0]
-        activity_records = run_query("SELECT COUNT(*) as cnt FROM raw.activity_log")['cnt'][0]
+        counts = run_query("""
+            SELECT
+                (SELECT APPROX_COUNT_DISTINCT(employee_id) FROM staging.stg_payroll) AS emp,
+                (SELECT COUNT(*) FROM raw.crmc_payrollfile) AS pay,
+                (SELECT COUNT(*) FROM staging.stg_attendance) AS att,
+                (SELECT COUNT(*) FROM raw.activity_log) AS act
+        """).to_pylist()[0]
 
-        col1.metric("Employees", f"{employee_count:,}")
-        col2.metric("Payroll Records", f"{payroll_records:,}")
-        col3.metric("Attendance Records", f"{attendance_records:,}")
-        col4.metric("Activity Logs", f"{activity_records:,}")
+        col1.metric("Employees", f"{counts['emp']:,}")
+        col2.metric("Payroll Records", f"{counts['pay']:,}")
+        col3.metric("Attendance Records", f"{counts['att']:,}")
+        col4.metric("Activity Logs", f"{counts['act']:,}")
 
 # Workforce Demographics Page
 elif page == "Workforce Demographics":
+    import plotly.graph_objects as go
+
     st.title("Workforce Demographics")
 
     try:
-        # Summary metrics
-        summary = run_query("""
-            SELECT
-                COUNT(DISTINCT employee_int_id) as total_employees,
-                COUNT(DISTINCT CASE WHEN employee_status = 'Active' THEN employee_int_id END) as active,
-                COUNT(DISTINCT department_name) as departments,
-                ROUND(AVG(tenure_years), 1) as avg_tenure
-            FROM business.workforce_demographics
-        """)
+        # Summary metrics, and active headcount by department, tenure band, type
+        # and span from one GROUPING SETS scan; dimension says which breakdown
+        # a row belongs to. The two queries run concurrently.
+        summary, breakdown = run_parallel(
+            (run_query, """
+                SELECT
+                    COUNT(DISTINCT employee_int_id) as total_employees,
+                    COUNT(DISTINCT CASE WHEN employee_status = 'Active' THEN employee_int_id END) as active,
+                    COUNT(DISTINCT department_name) as departments,
+                    ROUND(AVG(tenure_years), 1) as avg_tenure
+                FROM business.workforce_demographics
+            """),
+            (run_query, """
+                SELECT
+                    CASE
+                        WHEN GROUPING(department_name) = 0 THEN 'department'
+                        WHEN GROUPING(tenure_band) = 0 THEN 'tenure'
+                        WHEN GROUPING(employee_type) = 0 THEN 'type'
+                        ELSE 'span'
+                    END as dimension,
+                    department_name, tenure_band, employee_type, manager_span,
+                    COUNT(*) as count
+                FROM business.workforce_demographics
+                WHERE employee_status = 'Active'
+                GROUP BY GROUPING SETS (
+                    (department_name), (tenure_band, tenure_band_rank), (employee_type), (manager_span)
+                )
+                ORDER BY dimension, tenure_band_rank, count DESC
+            """),
+        )
 
-        if len(summary) > 0:
-            s = summary.iloc[0]
+        if summary.num_rows > 0:
+            s = summary.to_pylist()[0]
             col1, col2, col3, col4 = st.columns(4)
             col1.metric("Total Employees", f"{int(s['total_employees']):,}")
             col2.metric("Active", f"{int(s['active']):,}")
@@ -258,45 +619,30 @@ elif page == "Workforce Demographics":
 
         st.divider()
 
+        def breakdown_by(dimension, column):
+            return breakdown.filter(pc.equal(breakdown['dimension'], dimension)).select([column, 'count'])
+
         # Department breakdown
         col1, col2 = st.columns(2)
 
         with col1:
             st.subheader("Headcount by Department")
-            dept_data = run_query("""
-                SELECT department_name, COUNT(*) as count
-                FROM business.workforce_demographics
-                WHERE employee_status = 'Active'
-                GROUP BY department_name
-                ORDER BY count DESC
-                LIMIT 15
-            """)
-            if len(dept_data) > 0:
-                fig = px.bar(dept_data, x='count', y='department_name', orientation='h',
-                            labels={'count': 'Employees', 'department_name': 'Department'})
-                fig.update_layout(height=400, yaxis={'categoryorder': 'total ascending'})
+            dept_data = breakdown_by('department', 'department_name').slice(0, 15)
+            if dept_data.num_rows > 0:
+                fig = cached_figure('bar', dept_data, x='count', y='department_name', orientation='h',
+                                    labels={'count': 'Employees', 'department_name': 'Department'},
+                                    layout=dict(height=400, yaxis={'categoryorder': 'total ascending'}))
                 st.plotly_chart(fig, use_container_width=True)
 
         with col2:
             st.subheader("Tenure Distribution")
-            tenure_data = run_query("""
-                SELECT tenure_band, COUNT(*) as count
-                FROM business.workforce_demographics
-                WHERE employee_status = 'Active'
-                GROUP BY tenure_band
-                ORDER BY
-                    CASE tenure_band
-                        WHEN '< 1 Year' THEN 1
-                        WHEN '1-2 Years' THEN 2
-                        WHEN '3-4 Years' THEN 3
-                        WHEN '5-9 Years' THEN 4
-                        WHEN '10-19 Years' THEN 5
-                        WHEN '20+ Years' THEN 6
-                        ELSE 7
-                    END
-            """)
-            if len(tenure_data) > 0:
-                fig = px.pie(tenure_data, values='count', names='tenure_band', hole=0.4)
+            tenure_data = breakdown_by('tenure', 'tenure_band')
+            if tenure_data.num_rows > 0:
+                fig = go.Figure(go.Pie(
+                    labels=tenure_data['tenure_band'].to_pylist(),
+                    values=tenure_data['count'].to_pylist(),
+                    hole=0.4
+                ))
                 fig.update_layout(height=400)
                 st.plotly_chart(fig, use_container_width=True)
 
@@ -305,31 +651,24 @@ elif page == "Workforce Demographics":
 
         with col1:
             st.subheader("Employee Types")
-            type_data = run_query("""
-                SELECT employee_type, COUNT(*) as count
-                FROM business.workforce_demographics
-                WHERE employee_status = 'Active'
-                GROUP BY employee_type
-                ORDER BY count DESC
-            """)
-            if len(type_data) > 0:
-                fig = px.pie(type_data, values='count', names='employee_type')
+            type_data = breakdown_by('type', 'employee_type')
+            if type_data.num_rows > 0:
+                fig = go.Figure(go.Pie(
+                    labels=type_data['employee_type'].to_pylist(),
+                    values=type_data['count'].to_pylist()
+                ))
                 fig.update_layout(height=300)
                 st.plotly_chart(fig, use_container_width=True)
 
         with col2:
             st.subheader("Manager Span of Control")
-            span_data = run_query("""
-                SELECT manager_span, COUNT(*) as count
-                FROM business.workforce_demographics
-                WHERE employee_status = 'Active'
-                GROUP BY manager_span
-                ORDER BY count DESC
-            """)
-            if len(span_data) > 0:
-                fig = px.bar(span_data, x='manager_span', y='count',
-                            labels={'count': 'Employees', 'manager_span': 'Team Size'})
-                fig.update_layout(height=300)
+            span_data = breakdown_by('span', 'manager_span')
+            if span_data.num_rows > 0:
+                fig = go.Figure(go.Bar(
+                    x=span_data['manager_span'].to_pylist(),
+                    y=span_data['count'].to_pylist()
+                ))
+                fig.update_layout(height=300, xaxis_title='Team Size', yaxis_title='Employees')
                 st.plotly_chart(fig, use_container_width=True)
 
         st.divider()
@@ -340,42 +679,23 @@ elif page == "Workforce Demographics":
         # Filters
         col1, col2, col3 = st.columns(3)
         with col1:
-            dept_filter = st.selectbox("Department", ["All"] + list(run_query(
+            dept_filter = st.selectbox("Department", ["All"] + dropdown_options(
+                "workforce_dept",
                 "SELECT DISTINCT department_name FROM business.workforce_demographics WHERE department_name IS NOT NULL ORDER BY department_name"
-            )['department_name']))
+            ))
         with col2:
             status_filter = st.selectbox("Status", ["All", "Active", "Terminated"])
         with col3:
             tenure_filter = st.selectbox("Tenure", ["All", "< 1 Year", "1-2 Years", "3-4 Years", "5-9 Years", "10-19 Years", "20+ Years"])
 
-        query = """
-            SELECT employee_id, full_name, department_name, job_code_name,
-                   employee_type, employee_status, tenure_band, tenure_years,
-                   direct_reports, hourly_rate
-            FROM business.workforce_demographics
-            WHERE 1=1
-        """
-        params = []
-
-        if dept_filter != "All":
-            query += " AND department_name = ?"
-            params.append(dept_filter)
-        if status_filter != "All":
-            query += " AND employee_status = ?"
-            params.append(status_filter)
-        if tenure_filter != "All":
-            query += " AND tenure_band = ?"
-            params.append(tenure_filter)
-
-        query += " ORDER BY department_name, full_name LIMIT 500"
-
-        if params:
-            detail_df = run_query_safe(query, params)
-        else:
-            detail_df = run_query(query)
-
-        st.dataframe(detail_df, use_container_width=True, hide_index=True)
-        st.caption(f"Showing {len(detail_df)} employees")
+        detail_df = run_query_safe(WORKFORCE_DETAIL_SQL, [
+            dept_filter, dept_filter,
+            status_filter, status_filter,
+            tenure_filter, tenure_filter,
+        ])
+
+        show_table(detail_df)
+        st.caption(f"Showing {detail_df.num_rows} employees")
 
     except Exception as e:
         st.error(f"Could not load workforce demographics: {e}")
@@ -389,25 +709,40 @@ elif page == "Detailed Attendance":
         # Date range filter
         col1, col2 = st.columns(2)
         with col1:
-            start_date = st.date_input("Start Date", value=pd.Timestamp.now() - pd.Timedelta(days=30))
+            start_date = st.date_input("Start Date", value=date.today() - timedelta(days=30))
         with col2:
-            end_date = st.date_input("End Date", value=pd.Timestamp.now())
+            end_date = st.date_input("End Date", value=date.today())
 
-        # Daily summary metrics
-        daily_metrics = run_query_safe("""
+        # Range totals and the trend series come from one GROUPING SETS scan;
+        # the grand-total row is flagged with is_total = 1.
+        # Long ranges are bucketed by week or month so the chart stays a bounded size.
+        trend_bucket = trend_bucket_for((end_date - start_date).days)
+        attendance_summary = run_query_safe(f"""
             SELECT
+                attendance_date,
+                GROUPING(attendance_date) as is_total,
                 SUM(total_records) as total_records,
                 SUM(present_count) as present,
                 SUM(absent_count) as absent,
                 SUM(late_count) as late,
                 ROUND(SUM(ot_hours), 1) as ot_hours,
                 ROUND(100.0 * SUM(present_count) / NULLIF(SUM(total_records), 0), 1) as attendance_rate
-            FROM metrics.attendance_daily_metrics
-            WHERE attendance_date BETWEEN ? AND ?
+            FROM (
+                SELECT DATE_TRUNC('{trend_bucket}', attendance_date) as attendance_date,
+                       total_records, present_count, absent_count, late_count, ot_hours
+                FROM metrics.attendance_daily_metrics
+                WHERE attendance_date BETWEEN ? AND ?
+            )
+            GROUP BY GROUPING SETS ((attendance_date), ())
+            ORDER BY attendance_date
         """, [start_date, end_date])
+        daily_metrics = attendance_summary.filter(pc.equal(attendance_summary['is_total'], 1))
+        trend = attendance_summary.filter(pc.equal(attendance_summary['is_total'], 0)).select(
+            ['attendance_date', 'present', 'absent']
+        )
 
-        if len(daily_metrics) > 0:
-            m = daily_metrics.iloc[0]
+        if daily_metrics.num_rows > 0:
+            m = daily_metrics.to_pylist()[0]
             col1, col2, col3, col4, col5 = st.columns(5)
             col1.metric("Total Records", f"{int(m['total_records'] or 0):,}")
             col2.metric("Present", f"{int(m['present'] or 0):,}")
@@ -421,18 +756,11 @@ elif page == "Detailed Attendance":
         col1, col2 = st.columns(2)
 
         with col1:
-            st.subheader("Daily Attendance Trend")
-            trend = run_query_safe("""
-                SELECT attendance_date, SUM(present_count) as present, SUM(absent_count) as absent
-                FROM metrics.attendance_daily_metrics
-                WHERE attendance_date BETWEEN ? AND ?
-                GROUP BY attendance_date
-                ORDER BY attendance_date
-            """, [start_date, end_date])
-            if len(trend) > 0:
-                fig = px.line(trend, x='attendance_date', y=['present', 'absent'],
-                            labels={'value': 'Count', 'attendance_date': 'Date', 'variable': 'Status'})
-                fig.update_layout(height=300)
+            st.subheader(f"{TREND_BUCKET_LABELS[trend_bucket]} Attendance Trend")
+            if trend.num_rows > 0:
+                fig = cached_figure('line', trend, x='attendance_date', y=['present', 'absent'],
+                                    labels={'value': 'Count', 'attendance_date': 'Date', 'variable': 'Status'},
+                                    layout=dict(height=300))
                 st.plotly_chart(fig, use_container_width=True)
 
         with col2:
@@ -449,11 +777,11 @@ elif page == "Detailed Attendance":
                 ORDER BY rate DESC
                 LIMIT 10
             """, [start_date, end_date])
-            if len(dept_att) > 0:
-                fig = px.bar(dept_att, x='rate', y='department_name', orientation='h',
-                            labels={'rate': 'Attendance Rate (%)', 'department_name': 'Department'},
-                            color='rate', color_continuous_scale='RdYlGn')
-                fig.update_layout(height=300, yaxis={'categoryorder': 'total ascending'})
+            if dept_att.num_rows > 0:
+                fig = cached_figure('bar', dept_att, x='rate', y='department_name', orientation='h',
+                                    labels={'rate': 'Attendance Rate (%)', 'department_name': 'Department'},
+                                    color='rate', color_continuous_scale='RdYlGn',
+                                    layout=dict(height=300, yaxis={'categoryorder': 'total ascending'}))
                 st.plotly_chart(fig, use_container_width=True)
 
         st.divider()
@@ -464,36 +792,25 @@ elif page == "Detailed Attendance":
         # Filters
         col1, col2, col3 = st.columns(3)
         with col1:
-            dept_filter = st.selectbox("Filter by Department", ["All"] + list(run_query(
+            dept_filter = st.selectbox("Filter by Department", ["All"] + dropdown_options(
+                "attendance_dept",
                 "SELECT DISTINCT department_name FROM business.daily_attendance_detail WHERE department_name IS NOT NULL ORDER BY department_name"
-            )['department_name']))
+            ))
         with col2:
             status_filter = st.selectbox("Filter by Status", ["All", "Present", "Absent", "Leave", "Half Day"])
         with col3:
             late_filter = st.checkbox("Show Late Only")
 
-        query = """
-            SELECT attendance_date, employee_name, department_name, attendance_status,
-                   is_late, late_by_mins, total_hours, ot_hours
-            FROM business.daily_attendance_detail
-            WHERE attendance_date BETWEEN ? AND ?
-        """
-        params = [start_date, end_date]
-
-        if dept_filter != "All":
-            query += " AND department_name = ?"
-            params.append(dept_filter)
-        if status_filter != "All":
-            query += " AND attendance_status = ?"
-            params.append(status_filter)
-        if late_filter:
-            query += " AND is_late = TRUE"
-
-        query += " ORDER BY attendance_date DESC, employee_name LIMIT 500"
-
-        records = run_query_safe(query, params)
-        st.dataframe(records, use_container_width=True, hide_index=True)
-        st.caption(f"Showing {len(records)} records")
+        offset = page_offset("attendance_page")
+        records = run_query_safe(ATTENDANCE_RECORDS_SQL, [
+            start_date, end_date,
+            dept_filter, dept_filter,
+            status_filter, status_filter,
+            late_filter,
+            PAGE_SIZE, offset,
+        ])
+        show_table(records)
+        st.caption(f"Showing records {offset + 1:,}-{offset + records.num_rows:,}" if records.num_rows else "No records on this page")
 
     except Exception as e:
         st.error(f"Could not load attendance data: {e}")
@@ -516,8 +833,8 @@ elif page == "Payroll Analytics":
             WHERE pay_year = EXTRACT(YEAR FROM CURRENT_DATE)
         """)
 
-        if len(summary) > 0:
-            s = summary.iloc[0]
+        if summary.num_rows > 0:
+            s = summary.to_pylist()[0]
             col1, col2, col3, col4 = st.columns(4)
             col1.metric("Pay Periods (YTD)", f"{int(s['periods'] or 0):,}")
             col2.metric("Total Gross Pay (YTD)", f"${s['total_gross'] or 0:,.0f}")
@@ -532,36 +849,38 @@ elif page == "Payroll Analytics":
         with col1:
             st.subheader("Payroll Trend by Period")
             trend = run_query("""
-                SELECT pay_period,
-                       SUM(total_gross_pay) as gross_pay,
-                       SUM(total_employer_cost) as employer_cost
-                FROM metrics.payroll_period_metrics
-                GROUP BY pay_period
-                ORDER BY pay_period DESC
-                LIMIT 12
+                WITH last12 AS (
+                    SELECT pay_period,
+                           SUM(total_gross_pay) as gross_pay,
+                           SUM(total_employer_cost) as employer_cost
+                    FROM metrics.payroll_period_metrics
+                    GROUP BY pay_period
+                    ORDER BY pay_period DESC
+                    LIMIT 12
+                )
+                SELECT * FROM last12 ORDER BY pay_period
             """)
-            if len(trend) > 0:
-                trend = trend.sort_values('pay_period')
-                fig = px.bar(trend, x='pay_period', y=['gross_pay', 'employer_cost'],
-                            barmode='group',
-                            labels={'value': 'Amount ($)', 'pay_period': 'Period', 'variable': 'Type'})
-                fig.update_layout(height=350)
+            if trend.num_rows > 0:
+                fig = cached_figure('bar', trend, x='pay_period', y=['gross_pay', 'employer_cost'],
+                                    barmode='group',
+                                    labels={'value': 'Amount ($)', 'pay_period': 'Period', 'variable': 'Type'},
+                                    layout=dict(height=350))
                 st.plotly_chart(fig, use_container_width=True)
 
         with col2:
             st.subheader("Payroll by Department (Latest Period)")
-            dept_pay = run_query("""
+            dept_pay = run_query_safe("""
                 SELECT department_name, total_gross_pay, employees_paid
                 FROM metrics.payroll_period_metrics
-                WHERE pay_period = (SELECT MAX(pay_period) FROM metrics.payroll_period_metrics)
+                WHERE pay_period = ?
                   AND department_name IS NOT NULL
                 ORDER BY total_gross_pay DESC
                 LIMIT 10
-            """)
-            if len(dept_pay) > 0:
-                fig = px.bar(dept_pay, x='total_gross_pay', y='department_name', orientation='h',
-                            labels={'total_gross_pay': 'Gross Pay ($)', 'department_name': 'Department'})
-                fig.update_layout(height=350, yaxis={'categoryorder': 'total ascending'})
+            """, [latest_pay_period("metrics.payroll_period_metrics")])
+            if dept_pay.num_rows > 0:
+                fig = cached_figure('bar', dept_pay, x='total_gross_pay', y='department_name', orientation='h',
+                                    labels={'total_gross_pay': 'Gross Pay ($)', 'department_name': 'Department'},
+                                    layout=dict(height=350, yaxis={'categoryorder': 'total ascending'}))
                 st.plotly_chart(fig, use_container_width=True)
 
         # Earnings breakdown
@@ -569,37 +888,35 @@ elif page == "Payroll Analytics":
 
         with col1:
             st.subheader("Top Earners (Latest Period)")
-            top_earners = run_query("""
+            top_earners = run_query_safe("""
                 SELECT employee_name, department_name, gross_pay, total_hours, effective_hourly_rate
                 FROM business.payroll_analytics
-                WHERE pay_period = (SELECT MAX(pay_period) FROM business.payroll_analytics)
+                WHERE pay_period = ?
                 ORDER BY gross_pay DESC
                 LIMIT 10
-            """)
-            if len(top_earners) > 0:
-                st.dataframe(top_earners, use_container_width=True, hide_index=True,
-                            column_config={
-                                "gross_pay": st.column_config.NumberColumn("Gross Pay", format="$%.2f"),
-                                "effective_hourly_rate": st.column_config.NumberColumn("Eff. Rate", format="$%.2f")
-                            })
+            """, [latest_pay_period("business.payroll_analytics")])
+            if top_earners.num_rows > 0:
+                show_table(top_earners, column_config=TOP_EARNER_COLS)
 
         with col2:
             st.subheader("Deductions & Taxes")
             tax_summary = run_query("""
-                SELECT pay_period,
-                       SUM(total_deductions) as deductions,
-                       SUM(total_employee_taxes) as employee_taxes,
-                       SUM(total_employer_taxes) as employer_taxes
-                FROM metrics.payroll_period_metrics
-                GROUP BY pay_period
-                ORDER BY pay_period DESC
-                LIMIT 6
+                WITH last6 AS (
+                    SELECT pay_period,
+                           SUM(total_deductions) as deductions,
+                           SUM(total_employee_taxes) as employee_taxes,
+                           SUM(total_employer_taxes) as employer_taxes
+                    FROM metrics.payroll_period_metrics
+                    GROUP BY pay_period
+                    ORDER BY pay_period DESC
+                    LIMIT 6
+                )
+                SELECT * FROM last6 ORDER BY pay_period
             """)
-            if len(tax_summary) > 0:
-                tax_summary = tax_summary.sort_values('pay_period')
-                fig = px.line(tax_summary, x='pay_period', y=['deductions', 'employee_taxes', 'employer_taxes'],
-                             labels={'value': 'Amount ($)', 'pay_period': 'Period', 'variable': 'Type'})
-                fig.update_layout(height=300)
+            if tax_summary.num_rows > 0:
+                fig = cached_figure('line', tax_summary, x='pay_period', y=['deductions', 'employee_taxes', 'employer_taxes'],
+                                    labels={'value': 'Amount ($)', 'pay_period': 'Period', 'variable': 'Type'},
+                                    layout=dict(height=300))
                 st.plotly_chart(fig, use_container_width=True)
 
         st.divider()
@@ -610,43 +927,21 @@ elif page == "Payroll Analytics":
         # Filters
         col1, col2 = st.columns(2)
         with col1:
-            period_options = run_query("SELECT DISTINCT pay_period FROM business.payroll_analytics ORDER BY pay_period DESC LIMIT 12")
-            period_filter = st.selectbox("Pay Period", ["All"] + list(period_options['pay_period']))
+            period_options = dropdown_options("pay_period", "SELECT DISTINCT pay_period FROM business.payroll_analytics ORDER BY pay_period DESC LIMIT 12")
+            period_filter = st.selectbox("Pay Period", ["All"] + period_options)
         with col2:
-            dept_filter = st.selectbox("Department", ["All"] + list(run_query(
+            dept_filter = st.selectbox("Department", ["All"] + dropdown_options(
+                "payroll_dept",
                 "SELECT DISTINCT department_name FROM business.payroll_analytics WHERE department_name IS NOT NULL ORDER BY department_name"
-            )['department_name']))
-
-        query = """
-            SELECT employee_name, department_name, pay_period, gross_pay, net_pay,
-                   deductions, total_hours, effective_hourly_rate
-            FROM business.payroll_analytics
-            WHERE 1=1
-        """
-        params = []
-
-        if period_filter != "All":
-            query += " AND pay_period = ?"
-            params.append(period_filter)
-        if dept_filter != "All":
-            query += " AND department_name = ?"
-            params.append(dept_filter)
-
-        query += " ORDER BY gross_pay DESC LIMIT 500"
-
-        if params:
-            records = run_query_safe(query, params)
-        else:
-            records = run_query(query)
-
-        st.dataframe(records, use_container_width=True, hide_index=True,
-                    column_config={
-                        "gross_pay": st.column_config.NumberColumn("Gross Pay", format="$%.2f"),
-                        "net_pay": st.column_config.NumberColumn("Net Pay", format="$%.2f"),
-                        "deductions": st.column_config.NumberColumn("Deductions", format="$%.2f"),
-                        "effective_hourly_rate": st.column_config.NumberColumn("Eff. Rate", format="$%.2f")
-                    })
-        st.caption(f"Showing {len(records)} records")
+            ))
+
+        records = run_query_safe(PAYROLL_RECORDS_SQL, [
+            period_filter, period_filter,
+            dept_filter, dept_filter,
+        ])
+
+        show_table(records, column_config=PAYROLL_RECORD_COLS)
+        st.caption(f"Showing {records.num_rows} records")
 
     except Exception as e:
         st.error(f"Could not load payroll data: {e}")
@@ -659,101 +954,92 @@ elif page == "Employees":
     # Search
     search = st.text_input("Search by name or ID", "")
 
+    offset = page_offset("employees_page")
+
     # Get employees
-    if search:
-        query = """
-            SELECT employee_id, full_name, num_benefit_plans, benefit_plan_types,
-                   total_current_arrears, corp_id
-            FROM business.employee_summary
-            WHERE LOWER(full_name) LIKE LOWER(?)
-               OR employee_id LIKE ?
-            ORDER BY full_name
-            LIMIT 100
-        """
+    employees_df = None
+    if search and ensure_extension('fts'):
+        try:
+            # Page one decides between ranked and pattern results for every page
+            if run_query_safe(EMPLOYEE_SEARCH_SQL, [search, PAGE_SIZE, 0]).num_rows > 0:
+                employees_df = run_query_safe(EMPLOYEE_SEARCH_SQL, [search, PAGE_SIZE, offset])
+        except duckdb.Error:
+            pass  # Search index not built yet
+    # Partial words and ID fragments have no full-text hits; match by pattern
+    if employees_df is None:
         search_pattern = f"%{search}%"
-        employees_df = run_query_safe(query, [search_pattern, search_pattern])
-    else:
-        query = """
-            SELECT employee_id, full_name, num_benefit_plans, benefit_plan_types,
-                   total_current_arrears, corp_id
-            FROM business.employee_summary
-            ORDER BY full_name
-            LIMIT 100
-        """
-        employees_df = run_query(query)
-
-    st.dataframe(
-        employees_df,
-        use_container_width=True,
-        hide_index=True,
-        column_config={
-            "employee_id": "Employee ID",
-            "full_name": "Name",
-            "num_benefit_plans": "# Plans",
-            "benefit_plan_types": st.column_config.TextColumn("Plan Types", width="large"),
-            "total_current_arrears": st.column_config.NumberColumn("Arrears", format="$%.2f"),
-            "corp_id": "Corp ID"
-        }
-    )
+        employees_df = run_query_safe(
+            EMPLOYEE_SQL, [search, search_pattern, search_pattern, PAGE_SIZE, offset]
+        )
+
+    show_table(employees_df, column_config=EMPLOYEE_COLS)
 
-    st.caption(f"Showing {len(employees_df)} employees")
+    st.caption(f"Showing employees {offset + 1:,}-{offset + employees_df.num_rows:,}" if employees_df.num_rows else "No employees on this page")
 
 # Benefits Page
 elif page == "Benefits":
     st.title("Benefits Analysis")
 
-    # Benefits metrics
-    col1, col2 = st.columns(2)
-
-    with col1:
-        st.subheader("Enrollment by Plan Type")
-        metrics_df = run_query("""
-            SELECT benefit_plan_type, employee_count, enrollment_records,
-                   ROUND(avg_current_arrears, 2) as avg_arrears
-            FROM metrics.headcount_metrics
-            ORDER BY employee_count DESC
-        """)
-        st.dataframe(metrics_df, use_container_width=True, hide_index=True)
-
-    with col2:
-        st.subheader("Top Plans by Enrollment")
-        fig = px.treemap(
-            metrics_df.head(10),
-            path=['benefit_plan_type'],
-            values='employee_count',
-            color='avg_arrears',
-            color_continuous_scale='RdYlGn_r'
-        )
-        st.plotly_chart(fig, use_container_width=True)
+    # Benefits metrics are drawn here once both page queries have returned
+    overview = st.container()
 
     st.divider()
 
     # Detailed benefits view
     st.subheader("Benefits Detail")
 
+    plan_types = dropdown_options("plan_type", """
+        SELECT benefit_plan_type
+        FROM metrics.headcount_metrics
+        GROUP BY benefit_plan_type
+        ORDER BY MAX(employee_count) DESC
+    """)
     plan_filter = st.selectbox(
         "Filter by Plan Type",
-        ["All"] + list(metrics_df['benefit_plan_type'].unique())
+        ["All"] + plan_types
     )
 
-    if plan_filter == "All":
-        detail_query = """
-            SELECT employee_id, full_name, benefit_plan_type, benefit_plan_name,
-                   coverage_tier, current_arrears, total_arrears
-            FROM business.payroll_detail
-            LIMIT 500
-        """
-        detail_df = run_query(detail_query)
-    else:
-        detail_query = """
+    offset = page_offset("benefits_page")
+    metrics_df, detail_df = run_parallel(
+        (run_query, """
+            SELECT benefit_plan_type, employee_count, enrollment_records,
+                   ROUND(avg_current_arrears, 2) as avg_arrears
+            FROM metrics.headcount_metrics
+            ORDER BY employee_count DESC
+        """),
+        (run_query_safe, """
             SELECT employee_id, full_name, benefit_plan_type, benefit_plan_name,
                    coverage_tier, current_arrears, total_arrears
             FROM business.payroll_detail
-            WHERE benefit_plan_type = ?
-            LIMIT 500
-        """
-        detail_df = run_query_safe(detail_query, [plan_filter])
-    st.dataframe(detail_df, use_container_width=True, hide_index=True)
+            WHERE ? = 'All' OR benefit_plan_type = ?
+            ORDER BY employee_id, benefit_plan_name
+            LIMIT ? OFFSET ?
+        """, [plan_filter, plan_filter, PAGE_SIZE, offset]),
+    )
+    show_table(detail_df)
+
+    with overview:
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.subheader("Enrollment by Plan Type")
+            show_table(metrics_df)
+
+        with col2:
+            st.subheader("Top Plans by Enrollment")
+            # metrics_df is already sorted by employee_count; slicing is zero-copy
+            top_plans = metrics_df.slice(0, 10).select(
+                ['benefit_plan_type', 'employee_count', 'avg_arrears']
+            )
+            fig = cached_figure(
+                'treemap',
+                top_plans,
+                path=['benefit_plan_type'],
+                values='employee_count',
+                color='avg_arrears',
+                color_continuous_scale='RdYlGn_r'
+            )
+            st.plotly_chart(fig, use_container_width=True)
 
 # Activity Log Page
 elif page == "Activity Log":
@@ -762,43 +1048,44 @@ elif page == "Activity Log":
     st.info("Showing activity from the last 30 days")
 
     # Activity summary
-    activity_df = run_query("""
-        SELECT activity_id, activity_timestamp, module,
-               activity_type, entered_by, system_ip
+    activity_df = run_query_ro("""
+        SELECT activity_timestamp, module, activity_type, entered_by
         FROM staging.stg_activity_log
         ORDER BY activity_timestamp DESC
         LIMIT 100
     """)
 
-    if len(activity_df) > 0:
+    if activity_df.num_rows > 0:
         # Activity by module
-        module_counts = activity_df['module'].value_counts().reset_index()
-        module_counts.columns = ['module', 'count']
+        module_counts = run_query("""
+            SELECT module, COUNT(*) AS count
+            FROM staging.stg_activity_log
+            GROUP BY module
+            ORDER BY count DESC
+        """)
 
         col1, col2 = st.columns([1, 2])
 
         with col1:
             st.subheader("Activity by Module")
-            fig = px.pie(module_counts, values='count', names='module')
-            st.plotly_chart(fig, use_container_width=True)
+            # A handful of categories; Streamlit's built-in chart avoids shipping plotly.js config
+            st.bar_chart(module_counts, x='module', y='count')
 
         with col2:
             st.subheader("Recent Activity")
-            st.dataframe(
-                activity_df[['activity_timestamp', 'module', 'activity_type', 'entered_by']],
-                use_container_width=True,
-                hide_index=True
-            )
+            show_table(activity_df)
     else:
         st.warning("No activity log data available")
 
 # AI Query Page
 elif page == "AI Query":
+    import plotly.express as px
+
     st.title("AI-Powered Query")
     st.caption("Ask questions about your HRMS data in natural language")
 
     # Get available models
-    @st.cache_data(ttl=60)
+    @st.cache_data(ttl=60, max_entries=1)
     def get_ollama_models():
         try:
             models = ollama.list()
@@ -812,27 +1099,119 @@ elif page == "AI Query":
         st.error("No Ollama models found. Make sure Ollama is running.")
         st.code("ollama serve", language="bash")
     else:
+        # Generated SQL may read spreadsheets or use vector search
+        for ext in ['fts', 'excel', 'vss']:
+            ensure_extension(ext)
+
         # Model selection in sidebar for cleaner UI
         selected_model = st.sidebar.selectbox("AI Model", models)
 
+        # Load the model ahead of the first question; refreshed before keep_alive lapses
+        @st.cache_data(ttl=1500, max_entries=8, show_spinner=False)
+        def warm_model(model):
+            ollama.generate(model=model, prompt="", keep_alive=OLLAMA_KEEP_ALIVE)
+            return True
+
+        try:
+            warm_model(selected_model)
+        except Exception:
+            pass  # The first question will load the model instead
+
         # Build schema context for the model
-        @st.cache_data
+        @st.cache_data(ttl=900, max_entries=1)
         def get_schema_context():
-            schema_df = conn.execute("""
-                SELECT table_schema || '.' || table_name as table_name,
-                       STRING_AGG(column_name || ' (' || data_type || ')', ', ') as columns
-                FROM information_schema.columns
-                WHERE table_schema IN ('staging', 'business', 'metrics')
-                GROUP BY table_schema, table_name
-                ORDER BY table_schema, table_name
-            """).fetchdf()
-            context = "Available tables and columns:\n\n"
-            for _, row in schema_df.iterrows():
-                context += f"- {row['table_name']}: {row['columns']}\n"
-            return context
+            # DuckDB assembles the whole listing; Python fetches one string
+            table_list = get_cursor().execute("""
+                SELECT STRING_AGG(
+                    '- ' || table_schema || '.' || table_name || ': ' || columns || chr(10), ''
+                    ORDER BY table_schema, table_name
+                )
+                FROM (
+                    SELECT table_schema, table_name,
+                           STRING_AGG(column_name || ' (' || data_type || ')', ', ' ORDER BY ordinal_position) as columns
+                    FROM information_schema.columns
+                    WHERE table_schema IN ('staging', 'business', 'metrics')
+                    GROUP BY table_schema, table_name
+                )
+            """).fetchone()[0]
+            return "Available tables and columns:\n\n" + (table_list or "")
 
         schema_context = get_schema_context()
 
+        # Generations are shared across sessions for an hour, keyed by question,
+        # model and schema context, so a repeated question skips the LLM call;
+        # its SQL still runs fresh. Streaming rules out st.cache_data here,
+        # since cached functions cannot draw into an outside placeholder.
+        @st.cache_resource(ttl=3600)
+        def generation_cache():
+            return threading.Lock(), {}
+
+        def generate_sql(question, model, schema_ctx, placeholder):
+            key = (question, model, hashlib.sha256(schema_ctx.encode()).hexdigest())
+            lock, cache = generation_cache()
+            with lock:
+                if key in cache:
+                    return cache[key]
+
+            prompt = f"""You are a SQL expert. Generate a DuckDB SQL query to answer the user's question.
+
+{schema_ctx}
+
+Important notes:
+- Use DuckDB SQL syntax
+- Only use tables and columns from the schema above
+- Return ONLY the SQL query, no explanations
+- Use appropriate JOINs when needed
+- Limit results to 100 rows unless the user asks for more
+
+User question: {question}
+
+SQL query:"""
+            # Show tokens as they arrive instead of blocking on the full response
+            generated_sql = ""
+            stream = ollama.generate(
+                model=model, prompt=prompt, stream=True,
+                keep_alive=OLLAMA_KEEP_ALIVE, options=SQL_GENERATION_OPTIONS
+            )
+            for chunk in stream:
+                generated_sql += chunk.response
+                placeholder.code(generated_sql, language="sql")
+            placeholder.empty()
+
+            generated_sql = generated_sql.strip()
+            # Clean up the response - remove markdown code blocks if present
+            fence = SQL_FENCE.match(generated_sql)
+            if fence:
+                generated_sql = fence.group(1).strip()
+
+            with lock:
+                if len(cache) >= 64:
+                    cache.pop(next(iter(cache)))
+                cache[key] = generated_sql
+            return generated_sql
+
+        # Planning rejects unknown tables and columns before any execution work;
+        # a SQL text that planned once does not need planning again.
+        @st.cache_data(ttl=3600, max_entries=64, show_spinner=False)
+        def explain_sql(sql):
+            get_cursor().execute("EXPLAIN " + sql)
+            return True
+
+        def run_generated_sql(sql):
+            """Run generated SQL and keep the result, with its column typing, in session state."""
+            if not READ_QUERY.match(sql):
+                raise ValueError("Only SELECT or WITH queries can be run here")
+            explain_sql(sql)
+            result = get_cursor().execute(sql).fetch_arrow_table()
+            st.session_state.query_result = result
+            # Worked out once per result rather than on every chart widget rerun
+            st.session_state.query_all_cols = result.column_names
+            st.session_state.query_numeric_cols = [
+                field.name for field in result.schema
+                if pa.types.is_integer(field.type) or pa.types.is_floating(field.type)
+                or pa.types.is_decimal(field.type)
+            ]
+
         # Session state initialization
         if 'generated_sql' not in st.session_state:
             st.session_state.generated_sql = ""
@@ -850,58 +1229,43 @@ elif page == "AI Query":
         ask_btn = st.button("Ask", type="primary", use_container_width=True)
 
         if ask_btn and user_question:
+            sql_placeholder = st.empty()
             with st.spinner(f"Generating and running query..."):
-                prompt = f"""You are a SQL expert. Generate a DuckDB SQL query to answer the user's question.
-
-{schema_context}
-
-Important notes:
-- Use DuckDB SQL syntax
-- Only use tables and columns from the schema above
-- Return ONLY the SQL query, no explanations
-- Use appropriate JOINs when needed
-- Limit results to 100 rows unless the user asks for more
-
-User question: {user_question}
-
-SQL query:"""
-
                 try:
-                    response = ollama.generate(model=selected_model, prompt=prompt)
-                    generated_sql = response.response.strip()
-                    # Clean up the response - remove markdown code blocks if present
-                    if generated_sql.startswith("```"):
-                        lines = generated_sql.split("\n")
-                        generated_sql = "\n".join(lines[1:-1] if lines[-1] == "```" else lines[1:])
+                    generated_sql = generate_sql(user_question, selected_model, schema_context, sql_placeholder)
                     st.session_state.generated_sql = generated_sql
                     st.session_state.query_error = None
 
                     # Execute immediately
-                    result_df = conn.execute(generated_sql).fetchdf()
-                    st.session_state.query_result = result_df
+                    run_generated_sql(generated_sql)
                 except Exception as e:
                     st.session_state.query_error = str(e)
                     st.session_state.query_result = None
 
         # Show results first (primary focus)
         if st.session_state.query_result is not None:
-            result_df = st.session_state.query_result
-            st.success(f"Query returned {len(result_df)} rows")
-            st.dataframe(result_df, use_container_width=True, hide_index=True)
+            result = st.session_state.query_result
+            st.success(f"Query returned {result.num_rows} rows")
+            show_table(result)
 
             # Offer to visualize if numeric columns exist
-            numeric_cols = result_df.select_dtypes(include=['number']).columns.tolist()
-            if len(numeric_cols) > 0 and len(result_df) > 1:
+            numeric_cols = st.session_state.query_numeric_cols
+            if len(numeric_cols) > 0 and result.num_rows > 1:
                 st.subheader("Quick Visualization")
                 col1, col2, col3 = st.columns(3)
                 with col1:
                     chart_type = st.selectbox("Chart Type", ["Bar", "Line", "Pie"])
                 with col2:
-                    all_cols = result_df.columns.tolist()
+                    all_cols = st.session_state.query_all_cols
                     x_col = st.selectbox("X-axis / Labels", all_cols)
                 with col3:
                     y_col = st.selectbox("Y-axis / Values", numeric_cols)
 
+                # Decimals chart as floats, as fetchdf() used to return them
+                result_df = result.cast(pa.schema([
+                    pa.field(field.name, pa.float64()) if pa.types.is_decimal(field.type) else field
+                    for field in result.schema
+                ])).to_pandas()
                 if chart_type == "Bar":
                     fig = px.bar(result_df, x=x_col, y=y_col)
                 elif chart_type == "Line":
@@ -928,8 +1292,7 @@ SQL query:"""
                 if st.button("Re-run Modified Query"):
                     with st.spinner("Running query..."):
                         try:
-                            result_df = conn.execute(edited_sql).fetchdf()
-                            st.session_state.query_result = result_df
+                            run_generated_sql(edited_sql)
                             st.session_state.generated_sql = edited_sql
                             st.session_state.query_error = None
                             st.rerun()
@@ -944,7 +1307,7 @@ SQL query:"""
                 WHERE table_schema IN ('staging', 'business', 'metrics')
                 ORDER BY table_schema, table_name, ordinal_position
             """)
-            st.dataframe(schema_info, use_container_width=True, hide_index=True)
+            show_table(schema_info)
 
 # Footer
 st.sidebar.divider()
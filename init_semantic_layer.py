@@ -9,44 +9,142 @@ import duckdb
 import yaml
 import os
 from pathlib import Path
+from datetime import datetime
 from dotenv import load_dotenv
 from urllib.parse import quote_plus
+from concurrent.futures import ThreadPoolExecutor
 from sqlalchemy import create_engine, text
 import pandas as pd
+import pyarrow as pa
+
+try:
+    from yaml import CSafeLoader as ConfigLoader  # LibYAML-backed parser
+except ImportError:
+    from yaml import SafeLoader as ConfigLoader
+
+try:
+    import connectorx as cx  # Optional: reads SQL Server results straight into Arrow
+except ImportError:
+    cx = None
 
 # Load environment variables (interpolate=False to preserve $ in passwords)
 load_dotenv(interpolate=False, override=True)
 
 
+# Character replacements used by sanitize_duckdb_name, applied in one pass
+TABLE_NAME_TRANSLATION = str.maketrans({' ': '_', '$': '', '-': '_', "'": ''})
+
+
+# Arrow types for SQL Server column types (INFORMATION_SCHEMA.COLUMNS.DATA_TYPE).
+# Decimals become float64 because pandas.read_sql coerces them to float;
+# anything unlisted is stored as text.
+SQL_SERVER_ARROW_TYPES = {
+    'bigint': pa.int64(),
+    'int': pa.int64(),
+    'smallint': pa.int64(),
+    'tinyint': pa.int64(),
+    'bit': pa.bool_(),
+    'decimal': pa.float64(),
+    'numeric': pa.float64(),
+    'money': pa.float64(),
+    'smallmoney': pa.float64(),
+    'float': pa.float64(),
+    'real': pa.float64(),
+    'date': pa.date32(),
+    'datetime': pa.timestamp('us'),
+    'datetime2': pa.timestamp('us'),
+    'smalldatetime': pa.timestamp('us'),
+    'time': pa.time64('us'),
+    'binary': pa.binary(),
+    'varbinary': pa.binary(),
+    'image': pa.binary(),
+}
+
+
+def conform_chunk(chunk, schema):
+    """Convert a fetched chunk (pandas or Arrow) to a table's fixed Arrow schema."""
+    if isinstance(chunk, pd.DataFrame):
+        for field in schema:
+            if pa.types.is_string(field.type) and chunk[field.name].dtype == object:
+                # e.g. uniqueidentifier arrives as uuid.UUID; keep it as text
+                chunk[field.name] = chunk[field.name].map(
+                    lambda v: v if v is None or isinstance(v, str) else str(v)
+                )
+        return pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+    return chunk.cast(schema, safe=False)  # e.g. drop sub-microsecond datetime2 digits
+
+
+def connection_string_value(value) -> str:
+    """Brace-quote a connection string value, so ';' or '=' in it stay literal."""
+    return "{" + str(value).replace("}", "}}") + "}"
+
+
+def quote_identifier(name: str) -> str:
+    """Quote a DuckDB identifier, escaping embedded double quotes."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def qualified_table(name: str) -> str:
+    """Quote a DuckDB table name, optionally schema-qualified."""
+    return '.'.join(quote_identifier(part) for part in name.split('.', 1))
+
+
 class SemanticLayerInitializer:
     def __init__(self, config_path="config.yaml"):
         """Initialize the semantic layer."""
         with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+            self.config = yaml.load(f, Loader=ConfigLoader)
 
         self.duckdb_path = self.config['duckdb']['database_path']
         self.conn = None
+        self._engine = None
+        self.native_catalog = None
+        self.pending_import_log = []
 
     def connect(self):
         """Connect to DuckDB and configure."""
         print(f"Connecting to DuckDB at {self.duckdb_path}...")
         self.conn = duckdb.connect(self.duckdb_path)
 
-        # Install and load extensions
+        # Use a local extension mirror if one is configured
+        extension_repository = self.config['duckdb'].get('extension_repository')
+        if extension_repository:
+            self.conn.execute("SET custom_extension_repository = ?", [extension_repository])
+
+        # Install and load extensions, skipping the download when already installed
+        installed = {
+            row[0] for row in self.conn.execute(
+                "SELECT extension_name FROM duckdb_extensions() WHERE installed"
+            ).fetchall()
+        }
         for ext in ['fts', 'excel', 'vss', 'httpfs']:
-            self.conn.execute(f"INSTALL {ext}; LOAD {ext};")
+            if ext not in installed:
+                self.conn.execute(f"INSTALL {ext}")
+            self.conn.execute(f"LOAD {ext}")
 
         # Configure DuckDB
         memory_limit = self.config['duckdb'].get('memory_limit', '4GB')
         threads = self.config['duckdb'].get('threads', 4)
 
-        self.conn.execute(f"SET memory_limit='{memory_limit}'")
-        self.conn.execute(f"SET threads={threads}")
+        self.conn.execute("SET memory_limit = ?", [memory_limit])
+        self.conn.execute("SET threads = ?", [int(threads)])
+        # Cache remote Parquet metadata across reads of the same file
+        self.conn.execute("SET enable_http_metadata_cache=true")
+
+        # Imports and model builds don't rely on row order; letting DuckDB
+        # skip order preservation lets large CTAS/INSERTs run fully parallel
+        self.conn.execute("SET preserve_insertion_order=false")
+
+        # Spill location for out-of-core work (DuckDB defaults to <database>.tmp)
+        temp_directory = self.config['duckdb'].get('temp_directory')
+        if temp_directory:
+            Path(temp_directory).mkdir(parents=True, exist_ok=True)
+            self.conn.execute("SET temp_directory = ?", [temp_directory])
 
         print("✓ Connected to DuckDB")
 
-    def connect_sql_server(self):
-        """Connect to SQL Server using SQLAlchemy with pymssql driver.
+    def sql_server_uri(self, scheme="mssql+pymssql"):
+        """Build the SQL Server connection URI.
 
         Credentials are read from environment variables first,
         falling back to config.yaml values.
@@ -65,11 +163,20 @@ class SemanticLayerInitializer:
 
         # URL-encode credentials to handle special characters
         encoded_password = quote_plus(password)
-        connection_string = (
-            f"mssql+pymssql://{username}:{encoded_password}@"
+        return (
+            f"{scheme}://{username}:{encoded_password}@"
             f"{sql_config['host']}:{sql_config['port']}/{sql_config['database']}"
         )
-        return create_engine(connection_string)
+
+    def connect_sql_server(self):
+        """Connect to SQL Server using SQLAlchemy with pymssql driver.
+
+        The engine is created once and its connection pool is reused by every
+        import; run() disposes it at the end.
+        """
+        if self._engine is None:
+            self._engine = create_engine(self.sql_server_uri(), pool_size=8, pool_pre_ping=True)
+        return self._engine
 
     def setup_sql_server_attachment(self):
         """Test SQL Server connection using SQLAlchemy."""
@@ -83,7 +190,6 @@ class SemanticLayerInitializer:
             engine = self.connect_sql_server()
             with engine.connect() as conn:
                 conn.execute(text("SELECT 1"))
-            engine.dispose()
             print("  ✓ SQL Server connection successful (using SQLAlchemy + pymssql)")
 
             # Store connection info for metadata
@@ -106,13 +212,50 @@ class SemanticLayerInitializer:
 
             print("  ✓ Connection info stored")
             print("\n  NOTE: Data will be imported from SQL Server into DuckDB tables")
-            print("  Using SQLAlchemy + pymssql (ARM Mac compatible)")
+            if self.attach_sql_server_native():
+                print("  Using DuckDB native SQL Server scan")
+            else:
+                print("  Using SQLAlchemy + pymssql (ARM Mac compatible)")
 
         except Exception as e:
             print(f"  ⚠️  Warning: Could not connect to SQL Server: {e}")
             print("  Check your config.yaml settings")
             raise
 
+    def attach_sql_server_native(self) -> bool:
+        """ATTACH SQL Server through a DuckDB extension, if one is configured.
+
+        With sql_server.native_extension set (e.g. "mssql"), imports scan
+        SQL Server from inside DuckDB instead of copying rows through
+        pandas. Returns False, leaving the pymssql path in use, when the
+        option is unset or the extension cannot be installed or attached.
+        """
+        sql_config = self.config['sql_server']
+        ext = sql_config.get('native_extension')
+        if not ext:
+            return False
+
+        username = os.getenv('SQL_SERVER_USERNAME') or sql_config.get('username')
+        password = os.getenv('SQL_SERVER_PASSWORD') or sql_config.get('password')
+        conn_str = ";".join(
+            f"{key}={connection_string_value(value)}" for key, value in [
+                ('Server', f"{sql_config['host']},{sql_config['port']}"),
+                ('Database', sql_config['database']),
+                ('User Id', username),
+                ('Password', password),
+            ]
+        ).replace("'", "''")
+
+        try:
+            self.conn.execute(f"INSTALL {ext} FROM community; LOAD {ext};")
+            self.conn.execute(f"ATTACH '{conn_str}' AS mssql (TYPE {ext}, READ_ONLY)")
+        except duckdb.Error as e:
+            print(f"  ⚠️  Native SQL Server scan unavailable ({ext}): {e}")
+            return False
+
+        self.native_catalog = "mssql"
+        return True
+
     def create_schemas(self):
         """Create schema structure for semantic layer."""
         print("\nCreating schema structure...")
@@ -140,9 +283,11 @@ class SemanticLayerInitializer:
                 table_name VARCHAR,
                 imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 row_count BIGINT,
-                status VARCHAR
+                status VARCHAR,
+                mode VARCHAR
             )
         """)
+        self.conn.execute("ALTER TABLE _metadata.import_log ADD COLUMN IF NOT EXISTS mode VARCHAR")
 
         print("  ✓ Import tracking table created")
 
@@ -151,74 +296,265 @@ class SemanticLayerInitializer:
         # Remove quotes if present
         name = name.strip("'\"")
         # Replace special characters
-        sanitized = name.replace(' ', '_').replace('$', '').replace('-', '_').replace("'", '').lower()
+        sanitized = name.translate(TABLE_NAME_TRANSLATION).lower()
         # If starts with a number, prefix with underscore
         if sanitized and sanitized[0].isdigit():
             sanitized = f"t_{sanitized}"
         return sanitized
 
-    def import_table_from_sql_server(self, sql_table_name: str, duckdb_table_name: str,
-                                      date_column: str = None, days_back: int = None):
-        """Import a table from SQL Server into DuckDB.
+    def sql_server_schema(self, sql_table_name: str):
+        """Build an Arrow schema from a SQL Server table's declared column types.
+
+        Returns None if the table's columns are not listed (e.g. a synonym).
+        """
+        clean_name = sql_table_name.strip("'\"")
+        with self.connect_sql_server().connect() as conn:
+            columns = conn.execute(text("""
+                SELECT COLUMN_NAME, DATA_TYPE FROM INFORMATION_SCHEMA.COLUMNS
+                WHERE TABLE_SCHEMA = :schema AND TABLE_NAME = :table
+                ORDER BY ORDINAL_POSITION
+            """), {'schema': self.config['sql_server'].get('schema', 'dbo'), 'table': clean_name}).fetchall()
+        if not columns:
+            return None
+        return pa.schema([
+            (name, SQL_SERVER_ARROW_TYPES.get(data_type.lower(), pa.string()))
+            for name, data_type in columns
+        ])
+
+    def fetch_table_chunks(self, sql_table_name: str, date_column: str = None,
+                           days_back: int = None, since=None):
+        """Read a table from SQL Server in chunks.
+
+        Yields Arrow tables when connectorx is installed (one per query),
+        otherwise pandas DataFrames of up to sync.batch_size rows, so the
+        pandas path never holds the whole table in memory. A days_back
+        window is read one day per query, oldest first, which keeps each
+        result set on the SQL Server side small. Every chunk is converted to
+        the table's declared column types, so a column that is all NULL in
+        the first chunk does not fix the wrong type for the rest.
 
         Args:
             sql_table_name: Name of table in SQL Server
-            duckdb_table_name: Target table name in DuckDB
             date_column: Optional column name for date filtering
             days_back: Optional number of days to look back (filters data)
+            since: Optional last imported date_column value; only rows at or
+                after it are read, so rows sharing the boundary timestamp are
+                picked up again (store_imported_table replaces them)
         """
-        try:
-            engine = self.connect_sql_server()
-
-            # Handle table names with special characters (including embedded quotes)
-            clean_name = sql_table_name.strip("'\"")
-            escaped_name = f"[{clean_name}]"
-
-            # Build query with optional date filter
-            if date_column and days_back:
+        # Handle table names with special characters (including embedded quotes)
+        clean_name = sql_table_name.strip("'\"")
+        escaped_name = "[" + clean_name.replace("]", "]]") + "]"
+
+        # Build queries with optional date filter
+        if date_column and since is not None:
+            # Bound at full precision rather than formatted into the SQL text
+            queries = [(f"""
+                SELECT * FROM {escaped_name}
+                WHERE [{date_column.replace("]", "]]")}] >= :since
+            """, {'since': since})]
+        elif date_column and days_back:
+            column = "[" + date_column.replace("]", "]]") + "]"
+            # One fixed anchor, so consecutive windows meet exactly
+            anchor = datetime.now().isoformat(timespec='milliseconds')
+            queries = []
+            for day in reversed(range(int(days_back))):
                 query = f"""
-                    SELECT * FROM {escaped_name}
-                    WHERE [{date_column}] >= DATEADD(day, -{days_back}, GETDATE())
+                SELECT * FROM {escaped_name}
+                WHERE {column} >= DATEADD(day, -{day + 1}, '{anchor}')
                 """
+                # The newest window stays open-ended so nothing dated ahead is dropped
+                if day > 0:
+                    query += f"  AND {column} < DATEADD(day, -{day}, '{anchor}')\n"
+                queries.append((query, None))
+        else:
+            queries = [(f"SELECT * FROM {escaped_name}", None)]
+
+        schema = self.sql_server_schema(sql_table_name)
+
+        # Skip empty results; an all-empty import still yields one chunk to
+        # create the table
+        last_chunk = None
+        rows_seen = False
+        for query, params in queries:
+            for chunk in self.read_query_chunks(query, params):
+                if schema is not None:
+                    chunk = conform_chunk(chunk, schema)
+                last_chunk = chunk
+                if len(chunk):
+                    rows_seen = True
+                    yield chunk
+        if not rows_seen and last_chunk is not None:
+            yield last_chunk
+
+    def read_query_chunks(self, query: str, params: dict = None):
+        """Run one SQL Server query, yielding its result in chunks.
+
+        params are bound to :name placeholders in query.
+        """
+        # Read as an Arrow table when connectorx is installed, so DuckDB scans
+        # the columns directly; otherwise go through pandas DataFrames.
+        # connectorx takes no query parameters, so bound queries use pandas.
+        if cx is not None and params is None:
+            yield cx.read_sql(self.sql_server_uri("mssql"), query, return_type="arrow")
+            return
+        batch_size = self.config.get('sync', {}).get('batch_size', 10000)
+        if params is not None:
+            query = text(query)
+        yield from pd.read_sql(query, self.connect_sql_server(), params=params, chunksize=batch_size)
+
+    def scan_native_table(self, conn, sql_table_name: str, date_column: str = None,
+                          days_back: int = None, since=None):
+        """Return a DuckDB relation over a table in the attached SQL Server.
+
+        Used in place of fetch_table_chunks once attach_sql_server_native()
+        succeeds; the rows go straight into DuckDB storage.
+        """
+        clean_name = sql_table_name.strip("'\"")
+        schema = self.config['sql_server'].get('schema', 'dbo')
+        query = (
+            f"SELECT * FROM {quote_identifier(self.native_catalog)}."
+            f"{quote_identifier(schema)}.{quote_identifier(clean_name)}"
+        )
+        if date_column and since is not None:
+            return conn.sql(query + f" WHERE {quote_identifier(date_column)} >= ?", params=[since])
+        if date_column and days_back:
+            query += f" WHERE {quote_identifier(date_column)} >= now() - INTERVAL {int(days_back)} DAY"
+        return conn.sql(query)
+
+    def last_imported_value(self, conn, duckdb_table_name: str, date_column: str):
+        """Return MAX(date_column) of an already imported table, or None."""
+        schema, table = duckdb_table_name.split('.', 1)
+        exists = conn.execute(
+            "SELECT 1 FROM duckdb_tables() WHERE schema_name = ? AND table_name = ?",
+            [schema, table]
+        ).fetchone()
+        if not exists:
+            return None
+        return conn.execute(
+            f"SELECT MAX({quote_identifier(date_column)}) FROM {qualified_table(duckdb_table_name)}"
+        ).fetchone()[0]
+
+    def store_imported_table(self, conn, duckdb_table_name: str, chunks,
+                             mode: str = 'full', date_column: str = None, since=None) -> int:
+        """Write imported chunks to a DuckDB table.
+
+        In 'full' mode the table is replaced; in 'incremental' mode the
+        chunks are appended and the returned row count is the delta. The
+        chunks of an incremental import start at since (inclusive), so rows
+        with date_column >= since are deleted first rather than duplicated.
+        Runs in one transaction on conn, so a failed import leaves the
+        previous copy of the table in place.
+        """
+        target = qualified_table(duckdb_table_name)
+
+        conn.begin()
+        try:
+            if mode == 'incremental':
+                conn.execute(
+                    f"DELETE FROM {target} WHERE {quote_identifier(date_column)} >= ?", [since]
+                )
+                row_count = 0
+                for chunk in chunks:
+                    row_count += conn.execute(
+                        f'INSERT INTO {target} SELECT * FROM chunk'
+                    ).fetchone()[0]
             else:
-                query = f"SELECT * FROM {escaped_name}"
+                for i, chunk in enumerate(chunks):
+                    if i == 0:
+                        conn.execute(f'CREATE OR REPLACE TABLE {target} AS SELECT * FROM chunk')
+                    else:
+                        conn.execute(f'INSERT INTO {target} SELECT * FROM chunk')
+                row_count = conn.execute(f'SELECT COUNT(*) FROM {target}').fetchone()[0]
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
 
-            # Read data into pandas DataFrame
-            df = pd.read_sql(query, engine)
-            engine.dispose()
+        return row_count
 
-            # Insert into DuckDB - split schema and table name for proper creation
-            if '.' in duckdb_table_name:
-                schema, table = duckdb_table_name.split('.', 1)
-                self.conn.execute(f'DROP TABLE IF EXISTS {schema}."{table}"')
-                self.conn.execute(f'CREATE TABLE {schema}."{table}" AS SELECT * FROM df')
-            else:
-                self.conn.execute(f'DROP TABLE IF EXISTS "{duckdb_table_name}"')
-                self.conn.execute(f'CREATE TABLE "{duckdb_table_name}" AS SELECT * FROM df')
+    def import_table_from_sql_server(self, sql_table_name: str, duckdb_table_name: str,
+                                      date_column: str = None, days_back: int = None,
+                                      parquet_path: str = None):
+        """Import a table from SQL Server into DuckDB.
 
-            # Log the import
-            row_count = len(df)
-            self.conn.execute("""
-                INSERT INTO _metadata.import_log (table_name, row_count, status)
-                VALUES (?, ?, 'success')
-            """, [duckdb_table_name, row_count])
+        Uses its own DuckDB cursor, so imports of different tables can run
+        on separate threads. When date_column is given and the table was
+        imported before, only rows from its MAX(date_column) onwards are
+        fetched and merged in; rows older than days_back are then pruned.
+        With parquet_path, the table is loaded from that Parquet export
+        (local path or s3:// URL) instead of SQL Server. The outcome is
+        queued for flush_import_log().
 
+        Args:
+            sql_table_name: Name of table in SQL Server
+            duckdb_table_name: Target table name in DuckDB
+            date_column: Optional column name for date filtering
+            days_back: Optional number of days to look back (filters data)
+            parquet_path: Optional Parquet export to load instead of SQL Server
+        """
+        conn = self.conn.cursor()
+        mode = 'full'
+        try:
+            since = None
+            if date_column and not parquet_path:
+                since = self.last_imported_value(conn, duckdb_table_name, date_column)
+                if since is not None:
+                    mode = 'incremental'
+
+            if parquet_path:
+                chunks = [conn.sql("SELECT * FROM read_parquet(?)", params=[parquet_path])]
+            elif self.native_catalog:
+                chunks = [self.scan_native_table(conn, sql_table_name, date_column, days_back, since)]
+            else:
+                chunks = self.fetch_table_chunks(sql_table_name, date_column, days_back, since)
+            row_count = self.store_imported_table(conn, duckdb_table_name, chunks, mode,
+                                                  date_column, since)
+
+            # Keep the rolling window: drop rows that have aged out since the last run
+            if mode == 'incremental' and days_back:
+                conn.execute(
+                    f"DELETE FROM {qualified_table(duckdb_table_name)} "
+                    f"WHERE {quote_identifier(date_column)} < now() - INTERVAL {int(days_back)} DAY"
+                )
+            self.pending_import_log.append(
+                (duckdb_table_name, datetime.now(), row_count, 'success', mode)
+            )
             return row_count
         except Exception as e:
-            self.conn.execute("""
-                INSERT INTO _metadata.import_log (table_name, row_count, status)
-                VALUES (?, 0, ?)
-            """, [duckdb_table_name, f'error: {str(e)}'])
+            self.pending_import_log.append(
+                (duckdb_table_name, datetime.now(), 0, f'error: {str(e)}', mode)
+            )
             raise
+        finally:
+            conn.close()
+
+    def flush_import_log(self):
+        """Write queued import outcomes to _metadata.import_log in one insert."""
+        if not self.pending_import_log:
+            return
+        log_df = pd.DataFrame(
+            self.pending_import_log,
+            columns=['table_name', 'imported_at', 'row_count', 'status', 'mode']
+        )
+        self.conn.execute("""
+            INSERT INTO _metadata.import_log (table_name, imported_at, row_count, status, mode)
+            SELECT * FROM log_df
+        """)
+        self.pending_import_log.clear()
 
     def create_example_raw_views(self):
-        """Import tables from SQL Server into DuckDB raw schema."""
+        """Import tables from SQL Server into DuckDB raw schema.
+
+        Tables are imported concurrently: reads share the SQL Server engine
+        pool and each import writes through its own DuckDB cursor.
+        """
         print("\nImporting tables from SQL Server...")
 
         # Get tables to sync from config
         sync_config = self.config.get('sync', {})
         tables = sync_config.get('tables', [])
         activity_log_days = sync_config.get('activity_log_days', 30)
+        parallel_imports = sync_config.get('parallel_imports', 4)
 
         if not tables:
             # Default example tables if none configured
@@ -227,97 +563,195 @@ class SemanticLayerInitializer:
                 "CRMC_PayrollFile",
             ]
 
-        for sql_table in tables:
-            # Convert SQL table name to valid DuckDB table name
-            duckdb_name = self.sanitize_duckdb_name(sql_table)
-            duckdb_table = f"raw.{duckdb_name}"
+        with ThreadPoolExecutor(max_workers=parallel_imports) as pool:
+            imports = []
+            for table in tables:
+                # Entries are table names, or mappings that name a Parquet export
+                if isinstance(table, dict):
+                    sql_table = table['name']
+                    parquet_path = table['path'] if table.get('source') == 'parquet' else None
+                else:
+                    sql_table, parquet_path = table, None
 
-            # Check if this is an activity_log table (filter to last N days)
-            is_activity_log = 'activity_log' in sql_table.lower()
+                # Convert SQL table name to valid DuckDB table name
+                duckdb_name = self.sanitize_duckdb_name(sql_table)
+                duckdb_table = f"raw.{duckdb_name}"
 
-            try:
-                if is_activity_log:
+                if parquet_path:
+                    print(f"  Importing: {parquet_path} -> {duckdb_table}...")
+                    future = pool.submit(
+                        self.import_table_from_sql_server, sql_table, duckdb_table,
+                        parquet_path=parquet_path
+                    )
+                # Check if this is an activity_log table (filter to last N days)
+                elif 'activity_log' in sql_table.lower():
                     print(f"  Importing: {sql_table} -> {duckdb_table} (last {activity_log_days} days)...")
-                    row_count = self.import_table_from_sql_server(
-                        sql_table, duckdb_table,
-                        date_column='EnteredDate',
-                        days_back=activity_log_days
+                    future = pool.submit(
+                        self.import_table_from_sql_server, sql_table, duckdb_table,
+                        'EnteredDate', activity_log_days
                     )
                 else:
                     print(f"  Importing: {sql_table} -> {duckdb_table}...")
-                    row_count = self.import_table_from_sql_server(sql_table, duckdb_table)
-                print(f"  ✓ Imported: {duckdb_table} ({row_count:,} rows)")
+                    future = pool.submit(self.import_table_from_sql_server, sql_table, duckdb_table)
+                imports.append((sql_table, duckdb_table, future))
+
+            for sql_table, duckdb_table, future in imports:
+                try:
+                    row_count = future.result()
+                    print(f"  ✓ Imported: {duckdb_table} ({row_count:,} rows)")
+                except Exception as e:
+                    print(f"  ⚠️  Could not import {sql_table}: {e}")
+
+        self.flush_import_log()
+
+    def run_model_dir(self, models_path: Path, kind: str):
+        """Execute every .sql model in a directory in one transaction.
+
+        If any model fails, the batch is rolled back and the models are
+        re-run one at a time so each error is reported against its file.
+        """
+        if not models_path.exists():
+            print(f"  ⚠️  No {kind} models found")
+            return
+
+        models = [
+            (sql_file.stem, sql_file.read_text(encoding='utf-8'))
+            for sql_file in sorted(models_path.glob("*.sql"))
+        ]
+
+        self.conn.begin()
+        try:
+            for name, sql_content in models:
+                self.conn.execute(sql_content)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+        else:
+            for name, _ in models:
+                print(f"  ✓ {name}")
+            return
+
+        for name, sql_content in models:
+            try:
+                print(f"  Creating: {name}...")
+                self.conn.execute(sql_content)
+                print(f"  ✓ {name}")
             except Exception as e:
-                print(f"  ⚠️  Could not import {sql_table}: {e}")
+                print(f"  ⚠️  Error with {name}: {e}")
 
     def create_staging_views(self):
         """Create staging views with cleaned data."""
         print("\nCreating staging views...")
-
-        # Read SQL files from models/staging/
-        staging_path = Path("models/staging")
-        if staging_path.exists():
-            for sql_file in sorted(staging_path.glob("*.sql")):
-                try:
-                    print(f"  Creating: {sql_file.stem}...")
-                    with open(sql_file, 'r') as f:
-                        sql_content = f.read()
-                        # Update queries to use raw schema
-                        self.conn.execute(sql_content)
-                    print(f"  ✓ {sql_file.stem}")
-                except Exception as e:
-                    print(f"  ⚠️  Error with {sql_file.stem}: {e}")
-        else:
-            print("  ⚠️  No staging models found")
+        self.run_model_dir(Path("models/staging"), "staging")
 
     def create_business_views(self):
         """Create business-friendly views."""
         print("\nCreating business views...")
+        self.run_model_dir(Path("models/business"), "business")
 
-        business_path = Path("models/business")
-        if business_path.exists():
-            for sql_file in sorted(business_path.glob("*.sql")):
-                try:
-                    print(f"  Creating: {sql_file.stem}...")
-                    with open(sql_file, 'r') as f:
-                        self.conn.execute(f.read())
-                    print(f"  ✓ {sql_file.stem}")
-                except Exception as e:
-                    print(f"  ⚠️  Error with {sql_file.stem}: {e}")
-        else:
-            print("  ⚠️  No business models found")
+    def create_search_indexes(self):
+        """Materialize employee search data with a full-text index."""
+        print("\nCreating search indexes...")
+
+        try:
+            print("  Creating: employee_search...")
+            self.conn.execute("""
+                CREATE OR REPLACE TABLE cache.employee_search AS
+                SELECT employee_id, full_name, num_benefit_plans, benefit_plan_types,
+                       total_current_arrears, corp_id
+                FROM business.employee_summary
+            """)
+            # Builds the fts_cache_employee_search schema used by the Employees page
+            self.conn.execute("""
+                PRAGMA create_fts_index(
+                    'cache.employee_search', 'employee_id',
+                    'employee_id', 'full_name', overwrite=1
+                )
+            """)
+            print("  ✓ employee_search")
+        except Exception as e:
+            print(f"  ⚠️  Error with employee_search: {e}")
 
     def create_metrics(self):
         """Create aggregated metrics views."""
         print("\nCreating metrics...")
+        self.run_model_dir(Path("models/metrics"), "metrics")
 
-        metrics_path = Path("models/metrics")
-        if metrics_path.exists():
-            for sql_file in sorted(metrics_path.glob("*.sql")):
-                try:
-                    print(f"  Creating: {sql_file.stem}...")
-                    with open(sql_file, 'r') as f:
-                        self.conn.execute(f.read())
-                    print(f"  ✓ {sql_file.stem}")
-                except Exception as e:
-                    print(f"  ⚠️  Error with {sql_file.stem}: {e}")
-        else:
-            print("  ⚠️  No metrics models found")
+    def create_filter_options(self):
+        """Materialize the dashboard's dropdown option lists."""
+        print("\nCreating filter options...")
+
+        try:
+            print("  Creating: filter_options...")
+            self.conn.execute("""
+                CREATE OR REPLACE TABLE cache.filter_options AS
+                WITH options AS (
+                    SELECT 'workforce_dept' AS kind, department_name AS value,
+                           ROW_NUMBER() OVER (ORDER BY department_name) AS sort_order
+                    FROM (SELECT DISTINCT department_name FROM business.workforce_demographics
+                          WHERE department_name IS NOT NULL)
+                    UNION ALL
+                    SELECT 'attendance_dept', department_name,
+                           ROW_NUMBER() OVER (ORDER BY department_name)
+                    FROM (SELECT DISTINCT department_name FROM business.daily_attendance_detail
+                          WHERE department_name IS NOT NULL)
+                    UNION ALL
+                    SELECT 'payroll_dept', department_name,
+                           ROW_NUMBER() OVER (ORDER BY department_name)
+                    FROM (SELECT DISTINCT department_name FROM business.payroll_analytics
+                          WHERE department_name IS NOT NULL)
+                    UNION ALL
+                    SELECT 'pay_period', pay_period,
+                           ROW_NUMBER() OVER (ORDER BY pay_period DESC)
+                    FROM (SELECT DISTINCT pay_period FROM business.payroll_analytics)
+                    UNION ALL
+                    SELECT 'plan_type', benefit_plan_type,
+                           ROW_NUMBER() OVER (ORDER BY MAX(employee_count) DESC)
+                    FROM metrics.headcount_metrics
+                    GROUP BY benefit_plan_type
+                )
+                SELECT * FROM options
+                WHERE kind <> 'pay_period' OR sort_order <= 12
+            """)
+            print("  ✓ filter_options")
+        except Exception as e:
+            print(f"  ⚠️  Error with filter_options: {e}")
 
     def create_metadata_tables(self):
         """Create metadata tracking tables."""
         print("\nCreating metadata tables...")
 
+        # Databases created before view_name was the key logged every refresh;
+        # set that table aside so it can be rebuilt with one row per view
+        legacy = self.conn.execute("""
+            SELECT 1 FROM duckdb_tables() t
+            WHERE t.schema_name = '_metadata' AND t.table_name = 'materialized_views'
+              AND NOT EXISTS (
+                  SELECT 1 FROM duckdb_constraints() c
+                  WHERE c.table_oid = t.table_oid AND c.constraint_type = 'PRIMARY KEY'
+              )
+        """).fetchone()
+        if legacy:
+            self.conn.execute("ALTER TABLE _metadata.materialized_views RENAME TO materialized_views_legacy")
+
         # Track materialized views
         self.conn.execute("""
             CREATE TABLE IF NOT EXISTS _metadata.materialized_views (
-                view_name VARCHAR,
+                view_name VARCHAR PRIMARY KEY,
                 last_refresh TIMESTAMP,
                 row_count BIGINT,
                 refresh_status VARCHAR
             )
         """)
 
+        if legacy:
+            self.conn.execute("""
+                INSERT INTO _metadata.materialized_views
+                SELECT * FROM _metadata.materialized_views_legacy
+                QUALIFY ROW_NUMBER() OVER (PARTITION BY view_name ORDER BY last_refresh DESC) = 1;
+                DROP TABLE _metadata.materialized_views_legacy;
+            """)
+
         # Track data quality metrics
         self.conn.execute("""
             CREATE TABLE IF NOT EXISTS _metadata.data_quality (
@@ -346,7 +780,12 @@ class SemanticLayerInitializer:
         self.create_example_raw_views()
         self.create_staging_views()
         self.create_business_views()
+        self.create_search_indexes()
         self.create_metrics()
+        self.create_filter_options()
+
+        if self._engine is not None:
+            self._engine.dispose()
 
         print("\n" + "=" * 60)
         print("✓ Semantic layer initialized successfully!")
@@ -76,6 +76,17 @@ SELECT
         ELSE '20+ Years'
     END AS tenure_band,
 
+    -- Tenure band display order
+    CASE
+        WHEN e.tenure_years IS NULL THEN 7
+        WHEN e.tenure_years < 1 THEN 1
+        WHEN e.tenure_years < 3 THEN 2
+        WHEN e.tenure_years < 5 THEN 3
+        WHEN e.tenure_years < 10 THEN 4
+        WHEN e.tenure_years < 20 THEN 5
+        ELSE 6
+    END AS tenure_band_rank,
+
     -- Age bands
     CASE
         WHEN e.age IS NULL THEN 'Unknown'
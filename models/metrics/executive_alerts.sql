@@ -8,6 +8,7 @@ WITH high_arrears AS (
     SELECT
         'HIGH_ARREARS' AS alert_type,
         'High' AS priority,
+        1 AS priority_rank,
         employee_id,
         TRIM(first_name) || ' ' || TRIM(last_name) AS employee_name,
         'Employee has high arrears balance' AS description,
@@ -23,6 +24,7 @@ chronic_lateness AS (
     SELECT
         'CHRONIC_LATENESS' AS alert_type,
         'Medium' AS priority,
+        2 AS priority_rank,
         CAST(a.employee_int_id AS VARCHAR) AS employee_id,
         w.full_name AS employee_name,
         'Employee frequently late in last 30 days' AS description,
@@ -42,6 +44,7 @@ dept_absence AS (
     SELECT
         'DEPT_HIGH_ABSENCE' AS alert_type,
         'Medium' AS priority,
+        2 AS priority_rank,
         w.department_name AS employee_id,
         w.department_name AS employee_name,
         'Department has high absence rate' AS description,
@@ -61,6 +64,7 @@ excessive_ot AS (
     SELECT
         'EXCESSIVE_OT' AS alert_type,
         'Low' AS priority,
+        3 AS priority_rank,
         CAST(a.employee_int_id AS VARCHAR) AS employee_id,
         w.full_name AS employee_name,
         'Employee has excessive overtime' AS description,
@@ -80,6 +84,7 @@ recent_terminations AS (
     SELECT
         'RECENT_TERMINATION' AS alert_type,
         'Low' AS priority,
+        3 AS priority_rank,
         employee_id,
         full_name AS employee_name,
         'Employee recently terminated' AS description,
@@ -107,6 +112,7 @@ all_alerts AS (
 SELECT
     alert_type,
     priority,
+    priority_rank,
     employee_id,
     employee_name,
     description,
@@ -115,10 +121,6 @@ SELECT
     detected_at
 FROM all_alerts
 ORDER BY
-    CASE priority
-        WHEN 'High' THEN 1
-        WHEN 'Medium' THEN 2
-        WHEN 'Low' THEN 3
-    END,
+    priority_rank,
     alert_type,
     employee_name;
@@ -8,11 +8,63 @@ Example: python scripts/cache_view.py business.employee_summary
 import duckdb
 import yaml
 import sys
+from pathlib import Path
 from datetime import datetime
 
+try:
+    from yaml import CSafeLoader as ConfigLoader  # LibYAML-backed parser
+except ImportError:
+    from yaml import SafeLoader as ConfigLoader
+
+
+def load_cache_order_by(config_path="config.yaml"):
+    """Read the optional cache_order_by mapping (view name -> columns)."""
+    if not Path(config_path).exists():
+        return {}
+    with open(config_path, 'r') as f:
+        config = yaml.load(f, Loader=ConfigLoader) or {}
+    return config.get('cache_order_by') or {}
+
+
+def record_refresh(conn, view_name, row_count, status):
+    """Write a view's refresh outcome to _metadata.materialized_views.
+
+    Databases initialized before view_name became the table's primary key
+    cannot take ON CONFLICT; their row for the view is replaced instead.
+    """
+    keyed = conn.execute("""
+        SELECT 1 FROM duckdb_constraints()
+        WHERE schema_name = '_metadata' AND table_name = 'materialized_views'
+          AND constraint_type = 'PRIMARY KEY'
+    """).fetchone()
+    values = [view_name, datetime.now(), row_count, status]
+    if keyed:
+        conn.execute("""
+            INSERT INTO _metadata.materialized_views
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (view_name) DO UPDATE SET
+                last_refresh = excluded.last_refresh,
+                row_count = excluded.row_count,
+                refresh_status = excluded.refresh_status
+        """, values)
+        return
+    conn.begin()
+    try:
+        conn.execute("DELETE FROM _metadata.materialized_views WHERE view_name = ?", [view_name])
+        conn.execute("INSERT INTO _metadata.materialized_views VALUES (?, ?, ?, ?)", values)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
 
-def cache_view(view_name, duckdb_path="hrmsdb.duckdb"):
-    """Materialize a view into a local table."""
+
+def cache_view(view_name, duckdb_path="hrmsdb.duckdb", order_by=None):
+    """Materialize a view into a local table.
+
+    With order_by (a column list), rows are written sorted on those columns
+    so DuckDB's per-row-group min/max stats can skip data for filters on
+    them. Sorting makes the CREATE slower but later filtered reads cheaper.
+    """
     print(f"Caching view: {view_name}")
     print("=" * 60)
 
@@ -32,26 +84,28 @@ def cache_view(view_name, duckdb_path="hrmsdb.duckdb"):
         print(f"Target: {cache_table}")
 
         # Check if view exists
-        check = conn.execute(f"""
-            SELECT COUNT(*) FROM information_schema.tables
-            WHERE table_schema = '{schema}' AND table_name = '{table}'
-        """).fetchone()[0]
-
-        if check == 0:
+        check = conn.execute("""
+            SELECT 1 FROM duckdb_tables() WHERE schema_name = ? AND table_name = ?
+            UNION ALL
+            SELECT 1 FROM duckdb_views() WHERE schema_name = ? AND view_name = ?
+            LIMIT 1
+        """, [schema, table, schema, table]).fetchone()
+
+        if check is None:
             print(f"✗ Error: View {schema}.{table} does not exist")
             return
 
-        # Drop existing cache table
-        conn.execute(f"DROP TABLE IF EXISTS {cache_table}")
-
         # Create cache table
         print("\nMaterializing view...")
         start_time = datetime.now()
 
+        order_clause = f"ORDER BY {', '.join(order_by)}" if order_by else ""
         conn.execute(f"""
-            CREATE TABLE {cache_table} AS
+            CREATE OR REPLACE TABLE {cache_table} AS
             SELECT * FROM {schema}.{table}
+            {order_clause}
         """)
+        conn.execute(f"ANALYZE {cache_table}")
 
         elapsed = (datetime.now() - start_time).total_seconds()
 
@@ -59,10 +113,7 @@ def cache_view(view_name, duckdb_path="hrmsdb.duckdb"):
         row_count = conn.execute(f"SELECT COUNT(*) FROM {cache_table}").fetchone()[0]
 
         # Update metadata
-        conn.execute("""
-            INSERT OR REPLACE INTO _metadata.materialized_views
-            VALUES (?, ?, ?, ?)
-        """, [view_name, datetime.now(), row_count, 'success'])
+        record_refresh(conn, view_name, row_count, 'success')
 
         print(f"✓ Cached {row_count:,} rows in {elapsed:.2f} seconds")
         print(f"\nQuery the cached data using: SELECT * FROM {cache_table}")
@@ -70,11 +121,11 @@ def cache_view(view_name, duckdb_path="hrmsdb.duckdb"):
     except Exception as e:
         print(f"✗ Error: {e}")
 
-        # Update metadata with error
-        conn.execute("""
-            INSERT OR REPLACE INTO _metadata.materialized_views
-            VALUES (?, ?, ?, ?)
-        """, [view_name, datetime.now(), 0, f'failed: {str(e)}'])
+        # Update metadata with error; a failure here must not hide the one above
+        try:
+            record_refresh(conn, view_name, 0, f'failed: {str(e)}')
+        except Exception as meta_error:
+            print(f"✗ Could not record the failure: {meta_error}")
 
     finally:
         conn.close()
@@ -89,4 +140,4 @@ if __name__ == "__main__":
         sys.exit(1)
 
     view_name = sys.argv[1]
-    cache_view(view_name)
+    cache_view(view_name, order_by=load_cache_order_by().get(view_name))
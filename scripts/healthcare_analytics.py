@@ -4,8 +4,62 @@ Healthcare-specific analytics queries for hospital HR data.
 Examples of common hospital workforce management reports.
 """
 
+import os
 import duckdb
-import pandas as pd
+
+from cache_view import cache_view
+from query_example import run_report
+
+# Views read by several reports: materialized into cache.* and reused while fresh
+HOT_VIEWS = ['business.clinical_staff_summary', 'metrics.clinical_workforce_metrics']
+CACHE_TTL = '1 HOUR'
+
+
+def fresh_cached_views(conn):
+    """Return the views whose cache table was refreshed successfully within CACHE_TTL."""
+    return {row[0] for row in conn.execute(f"""
+        SELECT view_name FROM _metadata.materialized_views
+        WHERE refresh_status = 'success'
+          AND last_refresh > now() - INTERVAL {CACHE_TTL}
+    """).fetchall()}
+
+
+def refresh_hot_views(duckdb_path):
+    """Re-cache any HOT_VIEWS not refreshed successfully within CACHE_TTL."""
+    try:
+        with duckdb.connect(duckdb_path, read_only=True) as conn:
+            fresh = fresh_cached_views(conn)
+        for view in HOT_VIEWS:
+            if view not in fresh:
+                cache_view(view, duckdb_path)
+    except duckdb.Error as e:
+        # e.g. the database is open elsewhere; report_sources skips stale caches
+        print(f"Could not refresh cached views: {e}")
+
+
+def report_sources(conn):
+    """Map each hot view to a table the reports can scan repeatedly.
+
+    Uses the cache table when it was refreshed within CACHE_TTL; otherwise
+    the view is evaluated once into a session temp table, so the reports
+    sharing it never re-run its pipeline.
+    """
+    try:
+        fresh = fresh_cached_views(conn)
+    except duckdb.Error:
+        fresh = set()  # No cache metadata yet
+    sources = {}
+    for view in HOT_VIEWS:
+        table = view.split('.')[1]
+        if view in fresh:
+            sources[view] = f"cache.{table}"
+            continue
+        try:
+            conn.execute(f"CREATE TEMP TABLE {table} AS SELECT * FROM {view}")
+            sources[view] = f"temp.{table}"
+        except duckdb.Error:
+            sources[view] = view  # let each report surface the error
+    return sources
 
 
 def run_healthcare_analytics(duckdb_path="hrmsdb.duckdb"):
@@ -14,13 +68,22 @@ def run_healthcare_analytics(duckdb_path="hrmsdb.duckdb"):
     print("Hospital Healthcare Workforce Analytics")
     print("=" * 70)
 
-    conn = duckdb.connect(duckdb_path, read_only=True)
+    refresh_hot_views(duckdb_path)
+
+    # Scan-heavy reports: use every core and keep decoded blocks between queries
+    conn = duckdb.connect(duckdb_path, read_only=True, config={
+        'threads': os.cpu_count(),
+        'enable_object_cache': True,
+    })
+    sources = report_sources(conn)
+    staff_summary = sources['business.clinical_staff_summary']
+    workforce_metrics = sources['metrics.clinical_workforce_metrics']
 
     # Report 1: Clinical Staff by Role and Unit
     print("\n1. Clinical Staff Distribution by Role and Care Unit")
     print("-" * 70)
     try:
-        result = conn.execute("""
+        result, row_count = run_report(conn, f"""
             SELECT
                 clinical_role,
                 care_unit_type,
@@ -28,14 +91,14 @@ def run_healthcare_analytics(duckdb_path="hrmsdb.duckdb"):
                 COUNT(CASE WHEN employment_status = 'Active' THEN 1 END) as active_count,
                 ROUND(AVG(tenure_years), 1) as avg_tenure_years,
                 ROUND(AVG(attendance_rate_pct), 1) as avg_attendance_rate
-            FROM business.clinical_staff_summary
+            FROM {staff_summary}
             GROUP BY clinical_role, care_unit_type
             ORDER BY staff_count DESC
             LIMIT 15
-        """).fetchdf()
+        """)
 
-        print(result.to_string(index=False))
-        print(f"\n{len(result)} role-unit combinations")
+        result.show(max_rows=100)
+        print(f"\n{row_count} role-unit combinations")
     except Exception as e:
         print(f"Error: {e}")
 
@@ -43,7 +106,7 @@ def run_healthcare_analytics(duckdb_path="hrmsdb.duckdb"):
     print("\n\n2. Burnout Risk Analysis (High Overtime Staff)")
     print("-" * 70)
     try:
-        result = conn.execute("""
+        result, row_count = run_report(conn, f"""
             SELECT
                 clinical_role,
                 department,
@@ -52,17 +115,17 @@ def run_healthcare_analytics(duckdb_path="hrmsdb.duckdb"):
                 ROUND(AVG(overtime_percentage), 1) as avg_overtime_pct,
                 COUNT(CASE WHEN burnout_risk_level = 'High Risk' THEN 1 END) as high_risk_count,
                 COUNT(CASE WHEN burnout_risk_level = 'Moderate Risk' THEN 1 END) as moderate_risk_count
-            FROM business.clinical_staff_summary
+            FROM {staff_summary}
             WHERE employment_status = 'Active'
             GROUP BY clinical_role, department
             HAVING AVG(ytd_overtime_hours) > 50
             ORDER BY avg_overtime_hours DESC
             LIMIT 15
-        """).fetchdf()
+        """)
 
-        if len(result) > 0:
-            print(result.to_string(index=False))
-            print(f"\n{len(result)} roles with elevated overtime")
+        if row_count > 0:
+            result.show(max_rows=100)
+            print(f"\n{row_count} roles with elevated overtime")
         else:
             print("No high-overtime groups found (good news!)")
     except Exception as e:
@@ -72,7 +135,7 @@ def run_healthcare_analytics(duckdb_path="hrmsdb.duckdb"):
     print("\n\n3. Shift Coverage - Last 4 Weeks")
     print("-" * 70)
     try:
-        result = conn.execute("""
+        result, row_count = run_report(conn, """
             SELECT
                 TO_CHAR(week_start_date, 'YYYY-MM-DD') as week,
                 shift_type,
@@ -85,10 +148,10 @@ def run_healthcare_analytics(duckdb_path="hrmsdb.duckdb"):
             WHERE week_start_date >= CURRENT_DATE - INTERVAL '4 weeks'
             GROUP BY week_start_date, shift_type
             ORDER BY week_start_date DESC, shift_type
-        """).fetchdf()
+        """)
 
-        print(result.to_string(index=False))
-        print(f"\n{len(result)} shift-week combinations")
+        result.show(max_rows=100)
+        print(f"\n{row_count} shift-week combinations")
     except Exception as e:
         print(f"Error: {e}")
 
@@ -96,7 +159,7 @@ def run_healthcare_analytics(duckdb_path="hrmsdb.duckdb"):
     print("\n\n4. Department Staffing Levels (Current Month)")
     print("-" * 70)
     try:
-        result = conn.execute("""
+        result, row_count = run_report(conn, """
             SELECT
                 department,
                 shift_type,
@@ -111,10 +174,10 @@ def run_healthcare_analytics(duckdb_path="hrmsdb.duckdb"):
             WHERE year = EXTRACT(YEAR FROM CURRENT_DATE)
               AND month = EXTRACT(MONTH FROM CURRENT_DATE)
             ORDER BY department, shift_type
-        """).fetchdf()
+        """)
 
-        print(result.to_string(index=False))
-        print(f"\n{len(result)} department-shift combinations")
+        result.show(max_rows=100)
+        print(f"\n{row_count} department-shift combinations")
     except Exception as e:
         print(f"Error: {e}")
 
@@ -122,7 +185,7 @@ def run_healthcare_analytics(duckdb_path="hrmsdb.duckdb"):
     print("\n\n5. Critical Care Units Workforce Summary")
     print("-" * 70)
     try:
-        result = conn.execute("""
+        result, row_count = run_report(conn, f"""
             SELECT
                 care_unit_type,
                 clinical_role,
@@ -132,14 +195,14 @@ def run_healthcare_analytics(duckdb_path="hrmsdb.duckdb"):
                 ROUND(avg_attendance_rate, 1) as attendance_rate,
                 high_burnout_risk_count,
                 ROUND(avg_overtime_pct, 1) as avg_overtime_pct
-            FROM metrics.clinical_workforce_metrics
+            FROM {workforce_metrics}
             WHERE care_unit_type IN ('ICU/Critical Care', 'Emergency Department', 'Surgical Services')
               AND employment_status = 'Active'
             ORDER BY care_unit_type, staff_count DESC
-        """).fetchdf()
+        """)
 
-        print(result.to_string(index=False))
-        print(f"\n{len(result)} critical care staffing groups")
+        result.show(max_rows=100)
+        print(f"\n{row_count} critical care staffing groups")
     except Exception as e:
         print(f"Error: {e}")
 
@@ -147,7 +210,7 @@ def run_healthcare_analytics(duckdb_path="hrmsdb.duckdb"):
     print("\n\n6. Shift Differential Pay Analysis (Recent Month)")
     print("-" * 70)
     try:
-        result = conn.execute("""
+        result, row_count = run_report(conn, """
             SELECT
                 shift_type,
                 day_type,
@@ -159,9 +222,9 @@ def run_healthcare_analytics(duckdb_path="hrmsdb.duckdb"):
             WHERE year_month = TO_CHAR(CURRENT_DATE, 'YYYY-MM')
             GROUP BY shift_type, day_type
             ORDER BY shift_type, day_type
-        """).fetchdf()
+        """)
 
-        print(result.to_string(index=False))
+        result.show(max_rows=100)
     except Exception as e:
         print(f"Error: {e}")
 
@@ -169,7 +232,7 @@ def run_healthcare_analytics(duckdb_path="hrmsdb.duckdb"):
     print("\n\n7. Potential Turnover Risk - New vs Experienced Staff")
     print("-" * 70)
     try:
-        result = conn.execute("""
+        result, row_count = run_report(conn, f"""
             SELECT
                 clinical_role,
                 care_unit_type,
@@ -178,15 +241,15 @@ def run_healthcare_analytics(duckdb_path="hrmsdb.duckdb"):
                 experienced_staff_5plus_years,
                 ROUND(new_hires_under_1_year::DECIMAL / NULLIF(staff_count, 0) * 100, 1) as new_hire_pct,
                 ROUND(experienced_staff_5plus_years::DECIMAL / NULLIF(staff_count, 0) * 100, 1) as experienced_pct
-            FROM metrics.clinical_workforce_metrics
+            FROM {workforce_metrics}
             WHERE employment_status = 'Active'
               AND staff_count >= 5
             ORDER BY new_hire_pct DESC
             LIMIT 15
-        """).fetchdf()
+        """)
 
-        print(result.to_string(index=False))
-        print(f"\n{len(result)} units analyzed")
+        result.show(max_rows=100)
+        print(f"\n{row_count} units analyzed")
         print("\nHigh new hire % may indicate retention issues or rapid growth")
     except Exception as e:
         print(f"Error: {e}")
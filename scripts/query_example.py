@@ -4,8 +4,19 @@ Example queries demonstrating the semantic layer.
 Run this after initialization to test your setup.
 """
 
+import os
 import duckdb
-import pandas as pd
+
+
+def run_report(conn, sql):
+    """Run a report query once; return it as a relation plus its row count.
+
+    The result is fetched once as an Arrow table; the returned relation
+    scans that table, so printing it with DuckDB's table renderer does not
+    re-run the query.
+    """
+    result = conn.sql(sql).to_arrow_table()
+    return conn.from_arrow(result), result.num_rows
 
 
 def run_examples(duckdb_path="hrmsdb.duckdb"):
@@ -14,13 +25,17 @@ def run_examples(duckdb_path="hrmsdb.duckdb"):
     print("Semantic Layer Query Examples")
     print("=" * 60)
 
-    conn = duckdb.connect(duckdb_path, read_only=True)
+    # Scan-heavy reports: use every core and keep decoded blocks between queries
+    conn = duckdb.connect(duckdb_path, read_only=True, config={
+        'threads': os.cpu_count(),
+        'enable_object_cache': True,
+    })
 
     # Example 1: Employee Summary
     print("\n1. Active Employees Summary")
     print("-" * 60)
     try:
-        result = conn.execute("""
+        result, row_count = run_report(conn, """
             SELECT
                 full_name,
                 department,
@@ -32,10 +47,10 @@ def run_examples(duckdb_path="hrmsdb.duckdb"):
             WHERE employment_status = 'Active'
             ORDER BY tenure_years DESC
             LIMIT 10
-        """).fetchdf()
+        """)
 
-        print(result.to_string(index=False))
-        print(f"\n{len(result)} rows returned")
+        result.show(max_rows=100)
+        print(f"\n{row_count} rows returned")
     except Exception as e:
         print(f"Error: {e}")
 
@@ -43,7 +58,7 @@ def run_examples(duckdb_path="hrmsdb.duckdb"):
     print("\n\n2. Headcount by Department")
     print("-" * 60)
     try:
-        result = conn.execute("""
+        result, row_count = run_report(conn, """
             SELECT
                 department,
                 SUM(active_count) as active_employees,
@@ -53,10 +68,10 @@ def run_examples(duckdb_path="hrmsdb.duckdb"):
             WHERE employment_status = 'Active'
             GROUP BY department
             ORDER BY active_employees DESC
-        """).fetchdf()
+        """)
 
-        print(result.to_string(index=False))
-        print(f"\n{len(result)} departments")
+        result.show(max_rows=100)
+        print(f"\n{row_count} departments")
     except Exception as e:
         print(f"Error: {e}")
 
@@ -64,7 +79,7 @@ def run_examples(duckdb_path="hrmsdb.duckdb"):
     print("\n\n3. Recent Monthly Payroll")
     print("-" * 60)
     try:
-        result = conn.execute("""
+        result, row_count = run_report(conn, """
             SELECT
                 year_month,
                 SUM(employee_count) as employees,
@@ -75,10 +90,10 @@ def run_examples(duckdb_path="hrmsdb.duckdb"):
             GROUP BY year_month
             ORDER BY year_month DESC
             LIMIT 12
-        """).fetchdf()
+        """)
 
-        print(result.to_string(index=False))
-        print(f"\n{len(result)} months")
+        result.show(max_rows=100)
+        print(f"\n{row_count} months")
     except Exception as e:
         print(f"Error: {e}")
 
@@ -86,7 +101,7 @@ def run_examples(duckdb_path="hrmsdb.duckdb"):
     print("\n\n4. Recent Attendance Rates by Department")
     print("-" * 60)
     try:
-        result = conn.execute("""
+        result, row_count = run_report(conn, """
             SELECT
                 year_month,
                 department,
@@ -97,10 +112,10 @@ def run_examples(duckdb_path="hrmsdb.duckdb"):
             FROM metrics.attendance_metrics
             ORDER BY year_month DESC, department
             LIMIT 10
-        """).fetchdf()
+        """)
 
-        print(result.to_string(index=False))
-        print(f"\n{len(result)} rows")
+        result.show(max_rows=100)
+        print(f"\n{row_count} rows")
     except Exception as e:
         print(f"Error: {e}")
 
@@ -108,7 +123,7 @@ def run_examples(duckdb_path="hrmsdb.duckdb"):
     print("\n\n5. Available Views")
     print("-" * 60)
     try:
-        result = conn.execute("""
+        result, row_count = run_report(conn, """
             SELECT
                 table_schema,
                 table_name,
@@ -116,10 +131,10 @@ def run_examples(duckdb_path="hrmsdb.duckdb"):
             FROM information_schema.tables
             WHERE table_schema IN ('staging', 'business', 'metrics', 'cache')
             ORDER BY table_schema, table_name
-        """).fetchdf()
+        """)
 
-        print(result.to_string(index=False))
-        print(f"\n{len(result)} views available")
+        result.show(max_rows=100)
+        print(f"\n{row_count} views available")
     except Exception as e:
         print(f"Error: {e}")
 
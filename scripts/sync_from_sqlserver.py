@@ -8,29 +8,166 @@ import pyodbc
 import duckdb
 import yaml
 import os
-from datetime import datetime
+import sys
+import queue
+import logging
+import threading
+import shutil
+import tempfile
+import itertools
+from logging.handlers import QueueHandler, QueueListener
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote_plus
 from dotenv import load_dotenv
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+try:
+    from yaml import CSafeLoader as ConfigLoader  # LibYAML-backed parser
+except ImportError:
+    from yaml import SafeLoader as ConfigLoader
+
+try:
+    import connectorx as cx  # Optional: reads SQL Server results straight into Arrow
+except ImportError:
+    cx = None
 
 load_dotenv()
 
+log = logging.getLogger(__name__)
+
+# Let the ODBC driver manager keep closed connections for reuse, so sync
+# workers skip the TCP/TDS/login handshake; must be set before connecting
+pyodbc.pooling = True
+
+
+# The table each sync thread is working on, as a "[i/N] name: " prefix
+sync_context = threading.local()
+
+
+class TableLabelFilter(logging.Filter):
+    """Stamp each record with the table its thread is syncing (record.table)."""
+
+    def filter(self, record):
+        record.table = getattr(sync_context, 'label', '')
+        return True
+
+
+def start_logging():
+    """Route log records through a queue so a background thread writes them.
+
+    Sync threads only merge each message with its arguments and enqueue
+    it; the line format and console I/O run on the listener's thread, which
+    also keeps parallel output from interleaving. Records logged while a
+    table syncs are prefixed with its progress and name, since lines from
+    parallel workers arrive mixed together.
+    Returns the listener; stop() it to flush remaining records.
+    """
+    records = queue.SimpleQueue()
+    console = logging.StreamHandler(sys.stdout)
+    # record.table, set by the filter below, travels with the queued record
+    console.setFormatter(logging.Formatter('%(table)s%(message)s'))
+    listener = QueueListener(records, console)
+    handler = QueueHandler(records)
+    # The filter runs on the logging thread, where sync_context is set
+    handler.addFilter(TableLabelFilter())
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+    listener.start()
+    return listener
+
+
+# Arrow types for the Python types pyodbc reports in cursor.description.
+# Decimals become float64 because pandas.read_sql coerces them to float;
+# anything unlisted is written as a string.
+ARROW_TYPES = {
+    int: pa.int64(),
+    float: pa.float64(),
+    Decimal: pa.float64(),
+    bool: pa.bool_(),
+    str: pa.string(),
+    bytes: pa.binary(),
+    bytearray: pa.binary(),
+    datetime: pa.timestamp('us'),
+    date: pa.date32(),
+    time: pa.time64('us'),
+}
+
+
+# Character replacements for clean_column_names, applied in one pass
+COLUMN_NAME_TRANSLATION = str.maketrans({' ': '_', '$': None, '#': None})
+
+
+def clean_column_names(columns):
+    """Remove special characters and spaces from column names."""
+    return [col.translate(COLUMN_NAME_TRANSLATION) for col in columns]
+
+
+def connection_string_value(value):
+    """Brace-quote a connection string value, so ';' or '=' in it stay literal."""
+    return "{" + str(value).replace("}", "}}") + "}"
+
+
+def quote_sql_server(name):
+    """Bracket-quote a SQL Server identifier, escaping embedded brackets."""
+    return "[" + name.replace("]", "]]") + "]"
+
+
+def sql_string(value):
+    """Quote a value as a DuckDB string literal, for statements that take no parameters."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def conform_batch(batch, schema):
+    """Convert a batch (pandas or Arrow) to the table's declared Arrow schema.
+
+    pandas infers each batch's dtypes from its own rows: a column that is
+    all NULL has no type, and an int column with NULLs comes back as float.
+    """
+    if isinstance(batch, pd.DataFrame):
+        return pa.Table.from_pandas(batch, schema=schema, preserve_index=False)
+    return batch.cast(schema, safe=False)  # e.g. drop sub-microsecond datetime2 digits
+
+
+def nonempty_batches(batches):
+    """Return the batches unchanged, or None if the first one has no rows."""
+    batches = iter(batches)
+    first = next(batches, None)
+    if first is None or len(first) == 0:
+        return None
+    return itertools.chain([first], batches)
+
+
+def cleaned_select_list(columns):
+    """Build a SELECT list aliasing each source column to its cleaned name."""
+    return ", ".join(
+        '"{}" AS "{}"'.format(col.replace('"', '""'), clean.replace('"', '""'))
+        for col, clean in zip(columns, clean_column_names(columns))
+    )
+
 
 class SQLServerSyncManager:
     def __init__(self, config_path="config.yaml"):
         """Initialize sync manager."""
         with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+            self.config = yaml.load(f, Loader=ConfigLoader)
 
         self.sql_config = self.config['sql_server']
         self.duckdb_path = self.config['duckdb']['database_path']
         self.batch_size = self.config['sync'].get('batch_size', 10000)
+        self.parallel_syncs = self.config['sync'].get('parallel_imports', 4)
 
         self.sql_conn = None
         self.duck_conn = None
+        self.native_catalog = None
+        self.pending_metadata = []
 
-    def connect_sql_server(self):
-        """Connect to SQL Server."""
-        print("Connecting to SQL Server...")
+    def open_sql_server_connection(self):
+        """Open a new pyodbc connection to SQL Server."""
         connection_string = (
             f"DRIVER={{{self.sql_config['driver']}}};"
             f"SERVER={self.sql_config['host']},{self.sql_config['port']};"
@@ -38,19 +175,109 @@ class SQLServerSyncManager:
             f"UID={self.sql_config['username']};"
             f"PWD={self.sql_config['password']}"
         )
-        self.sql_conn = pyodbc.connect(connection_string)
-        print("✓ Connected to SQL Server")
+        conn = pyodbc.connect(connection_string)
+        # Suppress per-statement row-count messages (DONE_IN_PROC packets)
+        conn.execute("SET NOCOUNT ON")
+        return conn
+
+    def connect_sql_server(self):
+        """Connect to SQL Server."""
+        log.info("Connecting to SQL Server...")
+        self.sql_conn = self.open_sql_server_connection()
+        log.info("✓ Connected to SQL Server")
+
+    def connectorx_uri(self):
+        """Build the connectorx URI for the configured SQL Server."""
+        return (
+            f"mssql://{self.sql_config['username']}:{quote_plus(self.sql_config['password'])}@"
+            f"{self.sql_config['host']}:{self.sql_config['port']}/{self.sql_config['database']}"
+        )
 
     def connect_duckdb(self):
         """Connect to DuckDB."""
-        print(f"Connecting to DuckDB at {self.duckdb_path}...")
+        log.info(f"Connecting to DuckDB at {self.duckdb_path}...")
         self.duck_conn = duckdb.connect(self.duckdb_path)
-        print("✓ Connected to DuckDB")
+
+        # Bulk-load settings: use every core unless configured, and skip order
+        # preservation so CREATE TABLE AS / INSERT pipelines run in parallel
+        duckdb_config = self.config['duckdb']
+        self.duck_conn.execute("SET threads = ?", [int(duckdb_config.get('threads', os.cpu_count()))])
+        self.duck_conn.execute("SET memory_limit = ?", [duckdb_config.get('memory_limit', '4GB')])
+        self.duck_conn.execute("SET preserve_insertion_order = false")
+        log.info("✓ Connected to DuckDB")
+
+        # Per-table sync state; last_watermark is the incremental column's high-water mark
+        self.duck_conn.execute("CREATE SCHEMA IF NOT EXISTS _metadata")
+        # Tables created before table_name was the key logged every sync;
+        # set that table aside so it can be rebuilt with one row per table
+        legacy = self.duck_conn.execute("""
+            SELECT 1 FROM duckdb_tables() t
+            WHERE t.schema_name = '_metadata' AND t.table_name = 'data_freshness'
+              AND NOT EXISTS (
+                  SELECT 1 FROM duckdb_constraints() c
+                  WHERE c.table_oid = t.table_oid AND c.constraint_type = 'PRIMARY KEY'
+              )
+        """).fetchone()
+        if legacy:
+            self.duck_conn.execute("ALTER TABLE _metadata.data_freshness RENAME TO data_freshness_legacy")
+        self.duck_conn.execute("""
+            CREATE TABLE IF NOT EXISTS _metadata.data_freshness (
+                table_name VARCHAR PRIMARY KEY,
+                last_sync TIMESTAMP,
+                row_count BIGINT,
+                status VARCHAR,
+                last_watermark VARCHAR,
+                source_updated_at TIMESTAMP
+            )
+        """)
+        if legacy:
+            self.duck_conn.execute("""
+                INSERT INTO _metadata.data_freshness (table_name, last_sync, row_count, status)
+                SELECT table_name, last_sync, row_count, status
+                FROM _metadata.data_freshness_legacy
+                QUALIFY ROW_NUMBER() OVER (PARTITION BY table_name ORDER BY last_sync DESC) = 1;
+                DROP TABLE _metadata.data_freshness_legacy;
+            """)
+        self.duck_conn.execute("""
+            ALTER TABLE _metadata.data_freshness ADD COLUMN IF NOT EXISTS last_watermark VARCHAR;
+            ALTER TABLE _metadata.data_freshness ADD COLUMN IF NOT EXISTS source_updated_at TIMESTAMP;
+        """)
+        self.attach_sql_server_native()
+
+    def attach_sql_server_native(self):
+        """ATTACH SQL Server through a DuckDB extension, if one is configured.
+
+        With sql_server.native_extension set (e.g. "mssql"), tables are
+        copied by DuckDB itself and never pass through Python. Otherwise,
+        or if the extension cannot be loaded, the pyodbc path is used.
+        """
+        ext = self.sql_config.get('native_extension')
+        if not ext:
+            return
+
+        conn_str = ";".join(
+            f"{key}={connection_string_value(value)}" for key, value in [
+                ('Server', f"{self.sql_config['host']},{self.sql_config['port']}"),
+                ('Database', self.sql_config['database']),
+                ('User Id', self.sql_config['username']),
+                ('Password', self.sql_config['password']),
+            ]
+        ).replace("'", "''")
+        try:
+            self.duck_conn.execute(f"INSTALL {ext} FROM community; LOAD {ext};")
+            self.duck_conn.execute(f"ATTACH '{conn_str}' AS mssql (TYPE {ext}, READ_ONLY)")
+        except duckdb.Error as e:
+            log.warning(f"⚠️  Native SQL Server scan unavailable ({ext}): {e}")
+            return
+
+        self.native_catalog = "mssql"
+        log.info("✓ Attached SQL Server for native scans")
 
     def get_table_list(self):
         """Get list of tables to sync from SQL Server."""
         if 'tables' in self.config['sync']:
-            return self.config['sync']['tables']
+            # Mapping entries (e.g. Parquet sources for init) carry the name under 'name'
+            return [t['name'] if isinstance(t, dict) else t for t in self.config['sync']['tables']]
         else:
             # Query SQL Server for all user tables
             query = """
@@ -63,66 +290,423 @@ class SQLServerSyncManager:
             cursor.execute(query)
             return [row[0] for row in cursor.fetchall()]
 
-    def sync_table(self, table_name):
-        """Sync a single table from SQL Server to DuckDB."""
-        print(f"\n--- Syncing table: {table_name} ---")
+    def extract_batches(self, table_name, sql_conn, since_column=None, since=None, inclusive=False):
+        """Yield a SQL Server table in batches, with its source column names.
+
+        With connectorx the table arrives as one Arrow table; otherwise
+        pandas reads it batch_size rows at a time. With since_column, only
+        rows where that column is greater than since (or equal, if
+        inclusive) are read.
+        """
+        query = f'SELECT * FROM {quote_sql_server(table_name)}'
+        params = None
+        if since_column:
+            query += f' WHERE {quote_sql_server(since_column)} {">=" if inclusive else ">"} ?'
+            params = [since]
+        elif cx is not None:
+            # Full reads only: connectorx takes no query parameters
+            yield cx.read_sql(self.connectorx_uri(), query, return_type="arrow")
+            return
+        yield from pd.read_sql(query, sql_conn, params=params, chunksize=self.batch_size)
+
+    def copy_table_native(self, table_name, duck_conn):
+        """Copy a table from the attached SQL Server inside DuckDB.
+
+        Returns False, leaving raw untouched, if the source table is empty.
+        """
+        schema = self.sql_config.get('schema', 'dbo')
+        source = f'{self.native_catalog}.{schema}."{table_name}"'
+        if duck_conn.execute(f"SELECT 1 FROM {source} LIMIT 1").fetchone() is None:
+            return False
+        # Binding the relation reads the column list without scanning rows
+        select_list = cleaned_select_list(duck_conn.sql(f"SELECT * FROM {source}").columns)
+        duck_conn.execute(f'CREATE OR REPLACE TABLE raw."{table_name}" AS SELECT {select_list} FROM {source}')
+        return True
+
+    def source_updated_at(self, sql_conn, table_name):
+        """Return SQL Server's last recorded write to a table, without scanning it.
+
+        Read from sys.dm_db_index_usage_stats, which needs VIEW SERVER STATE
+        and is cleared when SQL Server restarts; returns None when there is
+        no entry or it cannot be read, so the table is treated as changed.
+        """
+        schema = self.sql_config.get('schema', 'dbo')
+        cursor = sql_conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT MAX(last_user_update) FROM sys.dm_db_index_usage_stats
+                WHERE database_id = DB_ID() AND object_id = OBJECT_ID(?)
+            """, f"{quote_sql_server(schema)}.{quote_sql_server(table_name)}")
+            return cursor.fetchone()[0]
+        except pyodbc.Error:
+            return None
+
+    def unchanged_row_count(self, duck_conn, table_name, updated_at):
+        """Return the last good sync's row count if the source has no newer write, else None."""
+        if updated_at is None:
+            return None
+        row = duck_conn.execute("""
+            SELECT row_count FROM _metadata.data_freshness
+            WHERE table_name = ? AND source_updated_at = ?
+              AND status IN ('success', 'unchanged')
+              AND EXISTS (
+                  SELECT 1 FROM duckdb_tables()
+                  WHERE schema_name = 'raw' AND table_name = ?
+              )
+        """, [table_name, updated_at, table_name]).fetchone()
+        return None if row is None else row[0]
+
+    def last_watermark(self, duck_conn, table_name, column):
+        """Return MAX(column) of the synced raw table, or None if it isn't there."""
+        exists = duck_conn.execute(
+            "SELECT 1 FROM duckdb_tables() WHERE schema_name = 'raw' AND table_name = ?",
+            [table_name]
+        ).fetchone()
+        if not exists:
+            return None
+        clean_column = clean_column_names([column])[0]
+        return duck_conn.execute(f'SELECT MAX("{clean_column}") FROM raw."{table_name}"').fetchone()[0]
+
+    def load_changes(self, table_name, sql_conn, duck_conn, settings, watermark):
+        """Merge rows changed since the watermark into the raw table.
+
+        Rows whose key columns match a changed row are replaced; without a
+        configured key, changes are appended. With a key, rows at the
+        watermark itself are read again (their old copies are replaced), so
+        rows committed later with that same timestamp are not missed;
+        keyless tables read strictly after it to avoid duplicates. Returns
+        False, leaving the table untouched, if the source columns no longer
+        match.
+        """
+        key = settings.get('key', [])
+        columns = [row[0] for row in duck_conn.execute(
+            "SELECT column_name FROM duckdb_columns() WHERE schema_name = 'raw' AND table_name = ? "
+            "ORDER BY column_index",
+            [table_name]
+        ).fetchall()]
+
+        duck_conn.begin()
+        try:
+            batches = self.extract_batches(
+                table_name, sql_conn, settings['column'], watermark, inclusive=bool(key)
+            )
+            for batch in batches:
+                if clean_column_names(batch.columns) != columns:
+                    duck_conn.rollback()
+                    return False
+                if key:
+                    # Raw table columns carry cleaned names; the batch keeps the source names
+                    match = " AND ".join(
+                        f't."{clean}" = batch."{col}"' for col, clean in zip(key, clean_column_names(key))
+                    )
+                    duck_conn.execute(f'DELETE FROM raw."{table_name}" AS t USING batch WHERE {match}')
+                duck_conn.execute(f'INSERT INTO raw."{table_name}" SELECT * FROM batch')
+            duck_conn.commit()
+        except Exception:
+            duck_conn.rollback()
+            raise
+        return True
+
+    def extract_and_load(self, table_name, sql_conn, duck_conn):
+        """Extract a table from SQL Server and load it into raw, batch by batch.
+
+        Only one batch is held in memory; Arrow batches (connectorx) are read
+        by DuckDB without a pandas step. Columns are renamed by the CREATE's
+        SELECT list, and later batches insert by position. Every batch is
+        converted to the table's declared column types first, so the types
+        do not depend on which rows the first batch happened to hold. The
+        load is one transaction, so a failure leaves the previous table in
+        place. Returns False, without touching raw, if the first batch is
+        empty.
+        """
+        log.info(f"  Extracting and loading into DuckDB...")
+        # Read before the extract starts, while the connection has no open results
+        schema = self.arrow_schema(sql_conn, table_name)
+        batches = nonempty_batches(self.extract_batches(table_name, sql_conn))
+        if batches is None:
+            return False
+        duck_conn.begin()
+        try:
+            for i, batch in enumerate(batches):
+                batch = conform_batch(batch, schema)
+                if i == 0:
+                    # Replace the table, taking its columns from the first batch;
+                    # binding the relation reads the column names without a scan
+                    select_list = cleaned_select_list(duck_conn.sql("SELECT * FROM batch").columns)
+                    duck_conn.execute(
+                        f'CREATE OR REPLACE TABLE raw."{table_name}" AS SELECT {select_list} FROM batch'
+                    )
+                else:
+                    duck_conn.execute(f'INSERT INTO raw."{table_name}" SELECT * FROM batch')
+            duck_conn.commit()
+        except Exception:
+            duck_conn.rollback()
+            raise
+        return True
+
+    def arrow_schema(self, sql_conn, table_name):
+        """Build an Arrow schema from a SQL Server table's declared column types."""
+        cursor = sql_conn.cursor()
+        cursor.execute(f'SELECT TOP 0 * FROM {quote_sql_server(table_name)}')
+        return pa.schema([
+            (column[0], ARROW_TYPES.get(column[1], pa.string())) for column in cursor.description
+        ])
+
+    def spill_and_load(self, table_name, sql_conn, duck_conn):
+        """Stream a large table to a local Parquet file, then load it in one CREATE.
+
+        DuckDB's parallel Parquet reader ingests the file faster than
+        per-batch INSERTs. The file is removed after a successful load and
+        left in place for inspection if the load fails. Returns False,
+        without touching raw, if the first batch is empty.
+        """
+        log.info(f"  Spilling to Parquet...")
+        # Batches are written with the table's declared types (conform_batch);
+        # read before the extract starts, while the connection has no open results
+        schema = self.arrow_schema(sql_conn, table_name)
+        batches = nonempty_batches(self.extract_batches(table_name, sql_conn))
+        if batches is None:
+            return False
+        fd, spill_path = tempfile.mkstemp(prefix=f"{table_name}_", suffix=".parquet")
+        os.close(fd)
+        writer = None
+        try:
+            for batch in batches:
+                batch = conform_batch(batch, schema)
+                if writer is None:
+                    writer = pq.ParquetWriter(spill_path, batch.schema, compression='zstd')
+                writer.write_table(batch)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        log.info(f"  Loading Parquet into DuckDB...")
+        try:
+            source = duck_conn.sql("SELECT * FROM read_parquet(?)", params=[spill_path])
+            select_list = cleaned_select_list(source.columns)
+            duck_conn.execute(
+                f'CREATE OR REPLACE TABLE raw."{table_name}" AS SELECT {select_list} FROM read_parquet(?)',
+                [spill_path]
+            )
+        except Exception:
+            log.info(f"  Spill file kept at {spill_path}")
+            raise
+        os.remove(spill_path)
+        return True
+
+    def load_partitions(self, table_name, sql_conn, duck_conn, partitioning):
+        """Sync an append-only table into date-partitioned Parquet files.
+
+        Files live under raw/<table>/partition_date=YYYY-MM-DD/ next to the
+        DuckDB database, and raw."<table>" becomes a view over them. After
+        the first load only the last days_back days are read from SQL
+        Server; their partitions are rewritten and older ones are kept.
+        Batches are written to a staging directory that replaces the old
+        partitions only once the extract has finished, so a failed sync
+        leaves the previous files in place. Returns False if the first load
+        finds the table empty.
+        """
+        column = partitioning['column']
+        root = os.path.join(os.path.dirname(os.path.abspath(self.duckdb_path)), 'raw', table_name)
+        staging = root + '.staging'
+        since = None
+        if os.path.isdir(root) and os.listdir(root):
+            since = datetime.combine(
+                datetime.now().date() - timedelta(days=partitioning.get('days_back', 1)),
+                datetime.min.time()
+            )
+            log.info(f"  Fetching partitions since {since.date()}...")
+        else:
+            log.info(f"  Extracting all partitions...")
+
+        # Every file gets the table's declared types, so read_parquet can
+        # combine files written by different batches and runs; read before
+        # the extract starts, while the connection has no open results
+        schema = self.arrow_schema(sql_conn, table_name)
+        batches = nonempty_batches(
+            self.extract_batches(table_name, sql_conn, column if since else None, since, inclusive=True)
+        )
+        if batches is None:
+            if since is None:
+                return False
+            batches = []  # Nothing new in the window
+
+        # Left over by an earlier failed sync
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        for batch in batches:
+            batch = conform_batch(batch, schema)
+            select_list = cleaned_select_list(duck_conn.sql("SELECT * FROM batch").columns)
+            # Unique file names let each batch add files to existing partitions
+            duck_conn.execute(f"""
+                COPY (SELECT {select_list}, CAST("{column}" AS DATE) AS partition_date FROM batch)
+                TO {sql_string(staging)}
+                (FORMAT PARQUET, PARTITION_BY (partition_date), OVERWRITE_OR_IGNORE,
+                 FILENAME_PATTERN 'batch_{{uuid}}')
+            """)
+
+        # Every batch is written; swap the re-read days in
+        if since is None:
+            shutil.rmtree(root, ignore_errors=True)
+            os.replace(staging, root)
+        else:
+            for name in os.listdir(root):
+                try:
+                    day = datetime.strptime(name, 'partition_date=%Y-%m-%d')
+                except ValueError:
+                    continue
+                if day >= since:
+                    shutil.rmtree(os.path.join(root, name))
+            for name in os.listdir(staging):
+                os.replace(os.path.join(staging, name), os.path.join(root, name))
+            os.rmdir(staging)
+
+        duck_conn.begin()
+        try:
+            # A table left by an earlier full sync would block the view
+            if duck_conn.execute(
+                "SELECT 1 FROM duckdb_tables() WHERE schema_name = 'raw' AND table_name = ?",
+                [table_name]
+            ).fetchone():
+                duck_conn.execute(f'DROP TABLE raw."{table_name}"')
+            duck_conn.execute(f"""
+                CREATE OR REPLACE VIEW raw."{table_name}" AS
+                SELECT * FROM read_parquet({sql_string(os.path.join(root, '**', '*.parquet'))},
+                                           hive_partitioning = true)
+            """)
+            duck_conn.commit()
+        except Exception:
+            duck_conn.rollback()
+            raise
+        return True
+
+    def sync_table(self, table_name, sql_conn=None, duck_conn=None, progress=None):
+        """Sync a single table from SQL Server to DuckDB.
+
+        Uses the manager's connections unless a worker passes its own.
+        progress (e.g. "[3/12]") prefixes this table's log lines along with
+        its name. Returns True if the table was synced.
+        """
+        sql_conn = sql_conn or self.sql_conn
+        duck_conn = duck_conn or self.duck_conn
+        sync_context.label = f"{progress} {table_name}: " if progress else f"{table_name}: "
+        log.info("--- Syncing table ---")
 
         try:
-            # Get row count from SQL Server
-            count_query = f'SELECT COUNT(*) FROM [{table_name}]'
-            cursor = self.sql_conn.cursor()
-            cursor.execute(count_query)
+            # Row estimate from partition metadata, for reporting only: it is
+            # NULL for views and can lag behind the table, so emptiness is
+            # decided by the first extracted batch instead
+            schema = self.sql_config.get('schema', 'dbo')
+            cursor = sql_conn.cursor()
+            cursor.execute("""
+                SELECT SUM(rows) FROM sys.partitions
+                WHERE object_id = OBJECT_ID(?) AND index_id IN (0, 1)
+            """, f"{quote_sql_server(schema)}.{quote_sql_server(table_name)}")
             row_count = cursor.fetchone()[0]
-            print(f"  Rows in SQL Server: {row_count:,}")
-
-            if row_count == 0:
-                print(f"  ⚠️  Table is empty, skipping")
-                return
-
-            # Extract data from SQL Server
-            print(f"  Extracting data...")
-            query = f'SELECT * FROM [{table_name}]'
-            df = pd.read_sql(query, self.sql_conn)
-
-            # Clean column names (remove special characters, spaces)
-            df.columns = [col.replace(' ', '_').replace('$', '').replace('#', '') for col in df.columns]
-
-            print(f"  Extracted {len(df):,} rows")
-
-            # Load into DuckDB raw schema
-            print(f"  Loading into DuckDB...")
-
-            # Drop existing table
-            self.duck_conn.execute(f'DROP TABLE IF EXISTS raw."{table_name}"')
-
-            # Create table and insert data
-            self.duck_conn.execute(f'CREATE TABLE raw."{table_name}" AS SELECT * FROM df')
+            if row_count is None:
+                log.info(f"  Rows in SQL Server: unknown")
+            else:
+                log.info(f"  Rows in SQL Server (estimate): {row_count:,}")
+
+            # Tables listed under sync.incremental only fetch rows past the last watermark
+            settings = (self.config['sync'].get('incremental') or {}).get(table_name)
+            # Tables listed under sync.partitioned are stored as date-partitioned Parquet
+            partitioning = (self.config['sync'].get('partitioned') or {}).get(table_name)
+            watermark = None
+            updated_at = None
+            if settings:
+                watermark = self.last_watermark(duck_conn, table_name, settings['column'])
+            elif not partitioning and self.config['sync'].get('skip_unchanged', False):
+                # Full-reload tables: skip the extract when SQL Server has recorded
+                # no write since the last sync
+                updated_at = self.source_updated_at(sql_conn, table_name)
+                previous_count = self.unchanged_row_count(duck_conn, table_name, updated_at)
+                if previous_count is not None:
+                    log.info(f"  ✓ Unchanged since last sync, skipping")
+                    self.update_metadata(table_name, previous_count, 'unchanged',
+                                         source_updated_at=updated_at)
+                    return True
+
+            merged = False
+            if watermark is not None:
+                log.info(f"  Fetching changes since {watermark}...")
+                merged = self.load_changes(table_name, sql_conn, duck_conn, settings, watermark)
+                if not merged:
+                    log.info(f"  Source columns changed, reloading the full table...")
+
+            if not merged:
+                if partitioning:
+                    loaded = self.load_partitions(table_name, sql_conn, duck_conn, partitioning)
+                elif self.native_catalog:
+                    log.info(f"  Copying inside DuckDB...")
+                    loaded = self.copy_table_native(table_name, duck_conn)
+                elif (row_count or 0) > self.config['sync'].get('spill_threshold_rows', float('inf')):
+                    loaded = self.spill_and_load(table_name, sql_conn, duck_conn)
+                else:
+                    loaded = self.extract_and_load(table_name, sql_conn, duck_conn)
+                if not loaded:
+                    log.warning(f"  ⚠️  Table is empty, skipping")
+                    return False
 
             # Verify load
-            verify_count = self.duck_conn.execute(
+            verify_count = duck_conn.execute(
                 f'SELECT COUNT(*) FROM raw."{table_name}"'
             ).fetchone()[0]
-            print(f"  ✓ Loaded {verify_count:,} rows into DuckDB")
+            log.info(f"  ✓ Loaded {verify_count:,} rows into DuckDB")
 
             # Update metadata
-            self.update_metadata(table_name, row_count, 'success')
+            if settings:
+                watermark = self.last_watermark(duck_conn, table_name, settings['column'])
+            self.update_metadata(table_name, verify_count, 'success', watermark, updated_at)
+            return True
 
         except Exception as e:
-            print(f"  ✗ Error syncing {table_name}: {str(e)}")
+            log.error(f"  ✗ Error syncing {table_name}: {str(e)}")
             self.update_metadata(table_name, 0, f'failed: {str(e)}')
-
-    def update_metadata(self, table_name, row_count, status):
-        """Update sync metadata in DuckDB."""
-        self.duck_conn.execute("""
-            INSERT OR REPLACE INTO _metadata.data_freshness
-            VALUES (?, ?, ?, ?)
-        """, [table_name, datetime.now(), row_count, status])
+            return False
+        finally:
+            sync_context.label = ''
+
+    def sync_table_in_worker(self, table_name, progress=None):
+        """Sync one table on its own SQL Server connection and DuckDB cursor.
+
+        pyodbc connections and DuckDB cursors must not be shared between
+        threads; writes to different tables from separate cursors run
+        concurrently.
+        """
+        sql_conn = self.open_sql_server_connection()
+        duck_conn = self.duck_conn.cursor()
+        try:
+            return self.sync_table(table_name, sql_conn, duck_conn, progress)
+        finally:
+            duck_conn.close()
+            sql_conn.close()
+
+    def update_metadata(self, table_name, row_count, status, watermark=None, source_updated_at=None):
+        """Queue a sync metadata row; flush_metadata() writes the batch."""
+        self.pending_metadata.append((
+            table_name, datetime.now(), row_count, status,
+            None if watermark is None else str(watermark), source_updated_at
+        ))
+
+    def flush_metadata(self):
+        """Write queued sync metadata to DuckDB in one statement."""
+        if not self.pending_metadata:
+            return
+        columns = ['table_name', 'last_sync', 'row_count', 'status', 'last_watermark', 'source_updated_at']
+        metadata_df = pd.DataFrame(self.pending_metadata, columns=columns)
+        column_list = ", ".join(columns)
+        self.duck_conn.execute(f"""
+            INSERT OR REPLACE INTO _metadata.data_freshness ({column_list})
+            SELECT {column_list} FROM metadata_df
+        """)
+        self.pending_metadata.clear()
 
     def sync_all(self):
         """Sync all configured tables."""
-        print("=" * 60)
-        print("SQL Server to DuckDB Sync")
-        print("=" * 60)
+        log.info("=" * 60)
+        log.info("SQL Server to DuckDB Sync")
+        log.info("=" * 60)
 
         self.connect_sql_server()
         self.connect_duckdb()
@@ -131,20 +715,28 @@ class SQLServerSyncManager:
         self.duck_conn.execute("CREATE SCHEMA IF NOT EXISTS raw")
 
         tables = self.get_table_list()
-        print(f"\nFound {len(tables)} tables to sync")
+        log.info(f"\nFound {len(tables)} tables to sync")
 
+        # Each table syncs on its own connections; tables overlap their
+        # SQL Server reads instead of waiting on one another
         success_count = 0
-        for i, table in enumerate(tables, 1):
-            print(f"\n[{i}/{len(tables)}] ", end="")
-            try:
-                self.sync_table(table)
-                success_count += 1
-            except Exception as e:
-                print(f"Error syncing {table}: {e}")
-
-        print("\n" + "=" * 60)
-        print(f"✓ Sync complete: {success_count}/{len(tables)} tables synced successfully")
-        print("=" * 60)
+        with ThreadPoolExecutor(max_workers=self.parallel_syncs) as pool:
+            futures = [
+                (table, pool.submit(self.sync_table_in_worker, table, f"[{i}/{len(tables)}]"))
+                for i, table in enumerate(tables, 1)
+            ]
+            for table, future in futures:
+                try:
+                    if future.result():
+                        success_count += 1
+                except Exception as e:
+                    log.error(f"Error syncing {table}: {e}")
+
+        self.flush_metadata()
+
+        log.info("\n" + "=" * 60)
+        log.info(f"✓ Sync complete: {success_count}/{len(tables)} tables synced successfully")
+        log.info("=" * 60)
 
     def close(self):
         """Close all connections."""
@@ -155,8 +747,7 @@ class SQLServerSyncManager:
 
 
 if __name__ == "__main__":
-    import sys
-
+    listener = start_logging()
     sync_manager = SQLServerSyncManager()
     try:
         if len(sys.argv) > 1:
@@ -165,8 +756,10 @@ if __name__ == "__main__":
             sync_manager.connect_sql_server()
             sync_manager.connect_duckdb()
             sync_manager.sync_table(table_name)
+            sync_manager.flush_metadata()
         else:
             # Sync all tables
             sync_manager.sync_all()
     finally:
         sync_manager.close()
+        listener.stop()
@@ -7,6 +7,11 @@ import os
 import pymssql
 import yaml
 
+try:
+    from yaml import CSafeLoader as ConfigLoader  # LibYAML-backed parser
+except ImportError:
+    from yaml import SafeLoader as ConfigLoader
+
 
 def test_connection():
     """Test SQL Server connection via pymssql."""
@@ -15,7 +20,7 @@ def test_connection():
     print("=" * 60)
 
     with open("config.yaml", 'r') as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=ConfigLoader)
 
     sql_config = config['sql_server']
     username = os.getenv('SQL_SERVER_USERNAME') or sql_config.get('username')